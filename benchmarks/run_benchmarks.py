@@ -0,0 +1,148 @@
+"""
+Times the analysis and baking of WavAnalizing on a synthetic corpus and saves the results as JSON.
+
+    python benchmarks/run_benchmarks.py --corpus quick --output results.json
+    python benchmarks/run_benchmarks.py --output new.json --compare results.json
+
+The analysis comes from the soundAnalizer package, which does not need Maya. The window is built
+against the recording stand-ins of maya in benchmarks/standins, so this runs in plain Python
+"""
+import argparse, json, os, os.path, platform, sys, tempfile, time, tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, "standins"), os.path.join(HERE, "..", "scripts"), HERE]
+
+import numpy as np
+
+from maya import cmds
+import synthwav
+import soundAnalizer, soundAnalizer.ui
+
+def measure(function):
+    """
+    Runs a function and returns its result, the seconds it took and the peak of memory it allocated
+    """
+    tracemalloc.start()
+    start = time.time()
+
+    result = function()
+
+    seconds = time.time() - start
+    peakBytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, seconds, peakBytes
+
+def benchmarkFile(description, fps, frameLimit, objects, attributes):
+    """
+    Returns the results of every benchmark on a single file
+    """
+    results = []
+    reader = soundAnalizer.WavReader(description["path"])
+    samplesPerFrame = reader.frameRate // fps
+    frames = min(frameLimit, reader.nFrames // samplesPerFrame)
+
+    def record(name, function, samples=0, frameCount=0, keys=0):
+        result, seconds, peakBytes = measure(function)
+        seconds = max(seconds, 1e-9)
+
+        results.append({"benchmark": name, "file": description["name"], "seconds": seconds, "peakBytes": peakBytes,
+                        "samplesPerSecond": samples / seconds, "framesPerSecond": frameCount / seconds,
+                        "keysPerSecond": keys / seconds})
+        return result
+
+    # Analysis, every benchmark starts with empty caches
+    record("sampleRange", lambda: reader.sampleRange(0, reader.nFrames), samples=reader.nFrames)
+    record("sampleStepped", lambda: reader.sampleStepped(fps), samples=reader.nFrames, frameCount=reader.nFrames // samplesPerFrame)
+    record("sampleFrequency", lambda: [reader.sampleFrequency(fps, frame) for frame in range(frames)],
+           samples=frames * samplesPerFrame, frameCount=frames)
+
+    windows = reader.sampleRange(0, frames * samplesPerFrame)[:, 0].reshape(frames, samplesPerFrame)
+    record("fft", lambda: [reader.fft(window) for window in windows], samples=windows.size, frameCount=frames)
+
+    reader.spectrograms.clear()
+    spectrumFrames = reader.spectrogramLength(*reader.analysisSizes(fps))
+    record("spectrogram", lambda: reader.spectrogram(fps), samples=reader.nFrames, frameCount=spectrumFrames)
+
+    # Baking, the stand-in counts the keys that Maya would get
+    ui = soundAnalizer.ui.theUI or soundAnalizer.ui.show()
+    ui.reader = reader
+    cmds.state.update({"fps": float(fps), "maxTime": frames, "objects": objects, "attributes": attributes})
+
+    for method in ("WaveForm", "Spectrum"):
+        ui.analyzerMethod = method
+        reader.spectrograms.clear()
+        cmds.reset()
+
+        record("bake" + method, lambda: ui.SetKeys("objects", "attributes"), frameCount=frames)
+        results[-1]["keysPerSecond"] = cmds.countKeys() / results[-1]["seconds"]
+        results[-1]["keys"] = cmds.countKeys()
+
+    reader.close()
+    return results
+
+def compare(results, previousPath, threshold):
+    """
+    Prints how every benchmark changed against an earlier run, returns the amount of regressions
+    """
+    with open(previousPath) as fileObject:
+        previous = dict(((result["benchmark"], result["file"]), result) for result in json.load(fileObject)["results"])
+
+    regressions = 0
+
+    for result in results:
+        before = previous.get((result["benchmark"], result["file"]))
+        if not before:
+            continue
+
+        ratio = result["seconds"] / max(before["seconds"], 1e-9)
+        flag = ""
+
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+
+        print("{:<18} {:<34} {:8.3f}s -> {:8.3f}s  x{:.2f}{}".format(result["benchmark"], result["file"], before["seconds"],
+                                                                      result["seconds"], ratio, flag))
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", choices=sorted(synthwav.CORPORA), default="quick", help="which synthetic files to use")
+    parser.add_argument("--directory", default=os.path.join(tempfile.gettempdir(), "MayaSoundAnalizerBench"),
+                        help="where the synthetic files are kept between runs")
+    parser.add_argument("--fps", type=int, default=30, help="frames per second of the animation")
+    parser.add_argument("--frames", type=int, default=1000, help="the most frames analyzed one by one and baked per file")
+    parser.add_argument("--objects", type=int, default=20, help="objects baked")
+    parser.add_argument("--attributes", type=int, default=3, help="attributes baked on every object")
+    parser.add_argument("--output", default="bench_output.json", help="where to save the results")
+    parser.add_argument("--compare", help="results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    objects = ["object{}".format(index) for index in range(args.objects)]
+    attributes = ["attribute{}".format(index) for index in range(args.attributes)]
+
+    results = []
+    for description in synthwav.buildCorpus(args.directory, args.corpus):
+        for result in benchmarkFile(description, args.fps, args.frames, objects, attributes):
+            results.append(result)
+            print("{:<18} {:<34} {:8.3f}s {:12.0f} samples/s {:10.0f} frames/s {:10.0f} keys/s {:8.1f} MB".format(
+                result["benchmark"], result["file"], result["seconds"], result["samplesPerSecond"],
+                result["framesPerSecond"], result["keysPerSecond"], result["peakBytes"] / 1024.0 ** 2))
+
+    report = {"corpus": args.corpus, "fps": args.fps, "frames": args.frames, "objects": args.objects,
+              "attributes": args.attributes, "python": platform.python_version(), "numpy": np.__version__,
+              "machine": platform.machine(), "processor": platform.processor(), "time": time.time(), "results": results}
+
+    with open(args.output, "w") as fileObject:
+        json.dump(report, fileObject, indent=2)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""
+A stand-in for maya.OpenMayaUI
+"""
+class MQtUtil(object):
+
+    @staticmethod
+    def findLayout(name):
+        return 0
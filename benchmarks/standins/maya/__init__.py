@@ -0,0 +1,3 @@
+"""
+Stand-ins for the Maya modules used by WavAnalizing, so it can be imported and benchmarked in plain Python
+"""
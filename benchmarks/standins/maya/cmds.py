@@ -0,0 +1,114 @@
+"""
+A stand-in for maya.cmds that records every call instead of running it.
+state holds what the queries answer, calls keeps every command with its arguments
+"""
+calls = []
+
+state = {"minTime": 1, "maxTime": 100, "fps": 30.0, "objects": [], "attributes": [], "attributeType": "doubleLinear"}
+
+# The amount of keys of every curve created, to answer the queries on them
+curveKeys = {}
+
+def reset():
+    """
+    Forgets the recorded calls
+    """
+    del calls[:]
+
+def countCalls(name):
+    """
+    Returns how many times a command was called
+    """
+    return sum(1 for call in calls if call[0] == name)
+
+def countKeys():
+    """
+    Returns the amount of keys set, both with setKeyframe and with bulk keyTimeValue setAttr calls
+    """
+    keys = countCalls("setKeyframe")
+
+    for name, args, kwargs in calls:
+        if name == "setAttr" and args and ".keyTimeValue[" in args[0]:
+            keys += (len(args) - 1) // 2
+
+    return keys
+
+def answer(name, args, kwargs):
+    """
+    Returns what Maya would return for the queries the tool does
+    """
+    query = kwargs.get("query") or kwargs.get("q")
+
+    if name == "playbackOptions" and query:
+        if kwargs.get("maxTime"):
+            return state["maxTime"]
+        if kwargs.get("minTime"):
+            return state["minTime"]
+        if kwargs.get("loop"):
+            return "continuous"
+        return 1.0
+
+    if name == "textScrollList" and query:
+        return list(state["objects"] if args and args[0] == "objects" else state["attributes"])
+
+    if name == "setAttr" and args and ".keyTimeValue[" in args[0]:
+        curve = args[0].split(".")[0]
+        curveKeys[curve] = max(curveKeys.get(curve, 0), (len(args) - 1) // 2)
+
+    if name == "cutKey" and args and args[0] in curveKeys and kwargs.get("index"):
+        curveKeys[args[0]] = kwargs["index"][0]
+
+    if name == "keyframe" and query and kwargs.get("keyframeCount"):
+        return curveKeys.get(args[0], 0)
+
+    if name == "keyframe" and query:
+        return []
+
+    if name == "getAttr":
+        return state["attributeType"] if kwargs.get("type") else 0.0
+
+    if name == "keyTangent" and query:
+        return ["auto"]
+
+    if name == "optionMenu" and query and (kwargs.get("itemListLong") or kwargs.get("value")):
+        return [] if kwargs.get("itemListLong") else ""
+
+    if name in ("currentTime", "intSliderGrp", "floatFieldGrp", "optionMenu") and query:
+        return 1
+
+    if name == "createNode":
+        return kwargs.get("name", args[0]).replace("#", "1")
+
+    if name == "polySphere":
+        return ["pSphere1", "polySphere1"]
+
+    if name in ("listConnections", "ls", "listAttr", "fileDialog2"):
+        return []
+
+    if name == "objExists":
+        return bool(args) and args[0] in curveKeys
+
+    if name == "play" or (name == "scriptJob" and kwargs.get("exists")):
+        return False
+
+    if name == "scriptJob":
+        return 1
+
+    return args[0] if args else name
+
+def command(name):
+    """
+    Builds a command that records its calls
+    """
+    def recordedCommand(*args, **kwargs):
+        calls.append((name, args, kwargs))
+        return answer(name, args, kwargs)
+
+    recordedCommand.__name__ = name
+    return recordedCommand
+
+def __getattr__(name):
+    if name.startswith("__"):
+        raise AttributeError(name)
+
+    return command(name)
@@ -0,0 +1,13 @@
+"""
+A stand-in for maya.mel that answers the expressions the tool evaluates
+"""
+from maya import cmds
+
+def eval(expression):
+    if "gPlayBackSlider" in expression:
+        return "timeControl1"
+
+    if "currentTimeUnitToFPS" in expression:
+        return cmds.state["fps"]
+
+    return None
@@ -0,0 +1,5 @@
+"""
+A stand-in for maya.utils, deferred commands run right away
+"""
+def executeDeferred(function, *args, **kwargs):
+    return function(*args, **kwargs)
@@ -0,0 +1,91 @@
+"""
+Generates the deterministic wav files used by the benchmarks
+"""
+import os, os.path, wave
+
+import numpy as np
+
+# Samples synthesized at once, the noise of every chunk has its own seed so the files
+# do not depend on how they are written
+CHUNK_FRAMES = 1 << 20
+
+# The files of every corpus as (seconds, bytes per sample, channels)
+CORPORA = {
+    "quick": [(2, 2, 1), (30, 1, 1), (30, 2, 2), (30, 3, 2), (30, 4, 2), (30, 2, 6)],
+    "standard": [(2, 2, 1), (60, 1, 1), (60, 2, 2), (60, 3, 2), (60, 4, 2), (60, 2, 6), (300, 3, 2)],
+    "full": [(2, 2, 1), (60, 1, 1), (60, 2, 2), (60, 3, 2), (60, 4, 2), (60, 2, 6), (300, 3, 2), (3600, 2, 2)],
+}
+
+def synthesize(start, count, channels, sampleRate):
+    """
+    Returns count frames starting at a frame as floats between -1 and 1: a chord, a kick every
+    half second and some noise, every channel slightly detuned
+    """
+    seconds = (start + np.arange(count)) / float(sampleRate)
+    noise = np.random.RandomState(start // CHUNK_FRAMES).uniform(-1, 1, (count, channels))
+
+    # The kick is a short decaying low tone at the start of every beat
+    beat = np.mod(seconds, 0.5)
+    kick = np.sin(2 * np.pi * 55 * beat) * np.exp(-beat * 30)
+
+    result = np.empty((count, channels))
+    for channel in range(channels):
+        detune = 1.0 + 0.002 * channel
+        chord = sum(np.sin(2 * np.pi * frequency * detune * seconds) for frequency in (220.0, 277.2, 329.6, 1760.0))
+        result[:, channel] = 0.15 * chord + 0.3 * kick + 0.05 * noise[:, channel]
+
+    return np.clip(result, -1, 1)
+
+def encode(values, sampleWidth):
+    """
+    Converts floats between -1 and 1 to little-endian PCM bytes
+    """
+    volume = 2 ** (8 * sampleWidth - 1) - 1
+    integers = np.round(values * volume).astype(np.int64)
+
+    if sampleWidth == 1:
+        # 8 bit files are unsigned
+        return (integers + 128).astype(np.uint8).tobytes()
+
+    if sampleWidth == 3:
+        # Keep the three low bytes of every little-endian int32
+        return integers.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+
+    return integers.astype({2: "<i2", 4: "<i4"}[sampleWidth]).tobytes()
+
+def writeWav(path, seconds, sampleWidth, channels, sampleRate=48000):
+    """
+    Writes a synthetic wav file, chunk by chunk so long files do not need much memory
+    """
+    frames = int(seconds * sampleRate)
+    waveFile = wave.open(path, "wb")
+    waveFile.setnchannels(channels)
+    waveFile.setsampwidth(sampleWidth)
+    waveFile.setframerate(sampleRate)
+
+    for start in range(0, frames, CHUNK_FRAMES):
+        count = min(CHUNK_FRAMES, frames - start)
+        waveFile.writeframes(encode(synthesize(start, count, channels, sampleRate), sampleWidth))
+
+    waveFile.close()
+
+def buildCorpus(directory, corpus="quick", sampleRate=48000):
+    """
+    Writes the files of a corpus that are not in the directory yet and returns their descriptions
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    files = []
+
+    for seconds, sampleWidth, channels in CORPORA[corpus]:
+        name = "synth_{}s_{}bit_{}ch_{}.wav".format(seconds, 8 * sampleWidth, channels, sampleRate)
+        path = os.path.join(directory, name)
+
+        if not os.path.exists(path):
+            writeWav(path, seconds, sampleWidth, channels, sampleRate)
+
+        files.append({"path": path, "name": name, "seconds": seconds, "bits": 8 * sampleWidth,
+                      "channels": channels, "sampleRate": sampleRate})
+
+    return files
@@ -0,0 +1,167 @@
+"""
+The audioFeature node drives attributes with the analysis of a wav file, without any keys.
+Its output is the value of the track on the current time, looked up in the analysis computed the first
+time the node is evaluated, so only the frames Maya evaluates cost anything:
+
+    cmds.loadPlugin("audioFeatureNode.py")
+    node = cmds.createNode("audioFeature")
+    cmds.setAttr(node + ".filePath", "song.wav", type="string")
+    cmds.connectAttr("time1.outTime", node + ".time")
+    cmds.connectAttr(node + ".output", "pCube1.translateY")
+
+The soundAnalizer package has to be on the Python path, the lookup itself is soundAnalizer.features
+"""
+import maya.api.OpenMaya as om
+
+from soundAnalizer.cache import AnalysisCache
+from soundAnalizer.features import featureLookup, MODES, MEASURES, SCALES
+
+# Tells Maya this plug-in uses the Python API 2.0
+maya_useNewAPI = True
+
+class AudioFeatureNode(om.MPxNode):
+    """
+    This class outputs base + multiplier * the value of a band or a channel of a track on the current time
+    """
+    typeName = "audioFeature"
+    typeId = om.MTypeId(0x0007F0A1)          # An id of the range Maya leaves for local nodes
+
+    # The attributes, created by initialize
+    filePath = None
+    mode = None
+    band = None
+    bands = None
+    channel = None
+    measure = None
+    scale = None
+    attack = None
+    release = None
+    multiplier = None
+    base = None
+    offset = None
+    time = None
+    output = None
+
+    # Tracks that could not be analyzed, so the warning is shown once and not on every frame
+    failedTracks = set()
+
+    @staticmethod
+    def creator():
+        return AudioFeatureNode()
+
+    @staticmethod
+    def initialize():
+        typedAttribute = om.MFnTypedAttribute()
+        enumAttribute = om.MFnEnumAttribute()
+        numericAttribute = om.MFnNumericAttribute()
+        unitAttribute = om.MFnUnitAttribute()
+
+        node = AudioFeatureNode
+
+        node.filePath = typedAttribute.create("filePath", "fp", om.MFnData.kString)
+        typedAttribute.usedAsFilename = True
+
+        node.mode = enumAttribute.create("mode", "mo", 0)
+        for index, name in enumerate(MODES):
+            enumAttribute.addField(name, index)
+
+        node.measure = enumAttribute.create("measure", "me", 0)
+        for index, name in enumerate(MEASURES):
+            enumAttribute.addField(name, index)
+
+        node.scale = enumAttribute.create("scale", "sc", 0)
+        for index, name in enumerate(SCALES):
+            enumAttribute.addField(name, index)
+
+        node.bands = numericAttribute.create("bands", "bs", om.MFnNumericData.kInt, 4)
+        numericAttribute.setMin(1)
+
+        node.band = numericAttribute.create("band", "bd", om.MFnNumericData.kInt, 1)
+        numericAttribute.setMin(1)
+
+        node.channel = numericAttribute.create("channel", "ch", om.MFnNumericData.kInt, 1)
+        numericAttribute.setMin(1)
+
+        # The seconds the envelope of a channel takes to rise and to fall
+        node.attack = numericAttribute.create("attack", "at", om.MFnNumericData.kDouble, 0.0)
+        numericAttribute.setMin(0.0)
+
+        node.release = numericAttribute.create("release", "rl", om.MFnNumericData.kDouble, 0.0)
+        numericAttribute.setMin(0.0)
+
+        node.multiplier = numericAttribute.create("multiplier", "mu", om.MFnNumericData.kDouble, 1.0)
+        numericAttribute.keyable = True
+
+        node.base = numericAttribute.create("base", "ba", om.MFnNumericData.kDouble, 0.0)
+        numericAttribute.keyable = True
+
+        # The frame where the track starts, like the offset of an audio node
+        node.offset = numericAttribute.create("offset", "of", om.MFnNumericData.kDouble, 1.0)
+
+        node.time = unitAttribute.create("time", "tm", om.MFnUnitAttribute.kTime, 0.0)
+
+        node.output = numericAttribute.create("output", "out", om.MFnNumericData.kDouble, 0.0)
+        numericAttribute.writable = False
+        numericAttribute.storable = False
+
+        inputs = (node.filePath, node.mode, node.measure, node.scale, node.bands, node.band, node.channel,
+                  node.attack, node.release, node.multiplier, node.base, node.offset, node.time)
+
+        for attribute in inputs:
+            om.MPxNode.addAttribute(attribute)
+        om.MPxNode.addAttribute(node.output)
+
+        for attribute in inputs:
+            om.MPxNode.attributeAffects(attribute, node.output)
+
+    def compute(self, plug, dataBlock):
+        if plug != AudioFeatureNode.output:
+            return None
+
+        node = AudioFeatureNode
+        filePath = dataBlock.inputValue(node.filePath).asString()
+        base = dataBlock.inputValue(node.base).asDouble()
+        value = 0.0
+
+        if filePath:
+            # The frame and the frames per second in the units of the scene
+            unit = om.MTime.uiUnit()
+            frame = dataBlock.inputValue(node.time).asTime().asUnits(unit)
+            fps = om.MTime(1.0, om.MTime.kSeconds).asUnits(unit)
+
+            bands = dataBlock.inputValue(node.bands).asInt()
+            attack = release = 0.0
+            if MODES[dataBlock.inputValue(node.mode).asShort()] == "Spectrum":
+                source = "band {}".format(min(dataBlock.inputValue(node.band).asInt(), bands))
+            else:
+                source = "channel {}".format(dataBlock.inputValue(node.channel).asInt())
+
+                # Only the envelope of a channel follows them, the bands share one analysis whatever they are
+                attack = dataBlock.inputValue(node.attack).asDouble()
+                release = dataBlock.inputValue(node.release).asDouble()
+
+            try:
+                value = featureLookup.lookup(filePath, frame, fps, source, MEASURES[dataBlock.inputValue(node.measure).asShort()],
+                                             bands, SCALES[dataBlock.inputValue(node.scale).asShort()], attack, release,
+                                             offset=dataBlock.inputValue(node.offset).asDouble())
+                node.failedTracks.discard(filePath)
+
+            except (IOError, OSError, ValueError) as error:
+                if filePath not in node.failedTracks:
+                    node.failedTracks.add(filePath)
+                    om.MGlobal.displayWarning("{}: {}".format(self.name(), error))
+
+        outputHandle = dataBlock.outputValue(node.output)
+        outputHandle.setDouble(base + dataBlock.inputValue(node.multiplier).asDouble() * value)
+        dataBlock.setClean(plug)
+
+def initializePlugin(plugin):
+    # The nodes share the disk cache of the window, tracks analyzed before load in milliseconds
+    featureLookup.cache = featureLookup.cache or AnalysisCache()
+
+    om.MFnPlugin(plugin, "danOrzc", "1.0", "Any").registerNode(AudioFeatureNode.typeName, AudioFeatureNode.typeId,
+                                                             AudioFeatureNode.creator, AudioFeatureNode.initialize)
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterNode(AudioFeatureNode.typeId)
+    featureLookup.clear()
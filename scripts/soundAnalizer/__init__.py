@@ -0,0 +1,22 @@
+"""
+The analysis engine of the Music Animator. It does not need Maya, so it can be used from
+mayapy or plain Python, and NumPy is only imported when the first file is analyzed.
+
+The window is built by the explicit entry point:
+
+    import soundAnalizer.ui
+    soundAnalizer.ui.show()
+"""
+from .profiling import Profiler, profiler, measured
+from .wavfile import WavMap, RingBuffer
+from .cache import AnalysisCache
+from .timing import exactRate, FrameTiming
+from .analysis import Envelope, PeakPyramid, WavReader
+from .registry import ReaderRegistry, readerRegistry
+from .features import FeatureLookup, featureLookup
+from .parallel import analyzeChunk, ParallelAnalyzer, AnalysisCancelled, AnalysisWorker
+from .scene import CurveWriter, PreviewDriver
+
+__all__ = ["Profiler", "profiler", "measured", "WavMap", "RingBuffer", "AnalysisCache", "exactRate", "FrameTiming", "Envelope", "PeakPyramid",
+           "WavReader", "ReaderRegistry", "readerRegistry", "FeatureLookup", "featureLookup", "analyzeChunk", "ParallelAnalyzer", "AnalysisCancelled",
+           "AnalysisWorker", "CurveWriter", "PreviewDriver"]
@@ -0,0 +1,1001 @@
+"""
+The analysis of wav files: spectrograms, envelopes and peaks
+"""
+from .compat import xrange
+from .lazy import LazyModule
+from .profiling import measured
+from .wavfile import WavMap, RingBuffer
+from .onsets import OnsetDetector
+from .timing import exactRate, nearestSamples
+
+np = LazyModule("numpy")
+
+class Envelope:
+    """
+    This class keeps prefix sums of the squared and absolute samples of a channel, so the RMS and
+    mean absolute value of any window take two lookups, and peaks are reduced in C.
+    With a blockSize the sums only have a value every blockSize samples, the samples at the edges
+    of a window that fall between two of them are read from the track
+    """
+    @measured("envelope.build")
+    def __init__(self, reader, channel=0, chunkSize=1048576, blockSize=1):
+
+        self.reader = reader
+        self.channel = channel
+        self.chunkSize = chunkSize
+        self.blockSize = blockSize
+
+        # The sums have a leading zero so the sum of the samples of blocks [a, b) is sums[b] - sums[a]
+        blockCount = reader.nFrames // blockSize
+        self.squares = np.zeros(blockCount + 1, dtype=np.float64)
+        self.absolutes = np.zeros(blockCount + 1, dtype=np.float64)
+
+        # Accumulate chunk by chunk so only one chunk of samples is decoded at a time, a chunk has whole blocks
+        chunkSize = max(blockSize, chunkSize - chunkSize % blockSize)
+
+        for start in xrange(0, blockCount * blockSize, chunkSize):
+            end = min(start + chunkSize, blockCount * blockSize)
+            samples = reader.decodeFrames(reader.wavMap.frames(start, end, channel))[:, 0].astype(np.float64).reshape(-1, blockSize)
+            first, last = start // blockSize, end // blockSize
+
+            np.cumsum((samples * samples).sum(axis=1), out=self.squares[first + 1:last + 1])
+            self.squares[first + 1:last + 1] += self.squares[first]
+
+            np.cumsum(np.abs(samples).sum(axis=1), out=self.absolutes[first + 1:last + 1])
+            self.absolutes[first + 1:last + 1] += self.absolutes[first]
+
+    def rms(self, starts, ends):
+        """
+        Returns the root mean square of the samples in every window [start, end)
+        """
+        sizes = np.maximum(ends - starts, 1)
+        return np.sqrt(self.windowSums(starts, ends, self.squares, np.square) / sizes).astype(np.float32)
+
+    def meanAbsolute(self, starts, ends):
+        """
+        Returns the mean absolute value of the samples in every window [start, end)
+        """
+        sizes = np.maximum(ends - starts, 1)
+        return (self.windowSums(starts, ends, self.absolutes, np.abs) / sizes).astype(np.float32)
+
+    def windowSums(self, starts, ends, sums, transform):
+        """
+        Returns the sum of the samples of every window [start, end) changed by a transform. The whole blocks come
+        from the sums, the samples before the first block and after the last block of the window are reduced
+        """
+        # The whole blocks of every window, a window inside a single block or after the last whole block has none
+        blockCount = len(sums) - 1
+        firstBlocks = np.minimum(-(-starts // self.blockSize), blockCount)
+        lastBlocks = np.maximum(np.minimum(ends // self.blockSize, blockCount), firstBlocks)
+        result = np.maximum(sums[lastBlocks] - sums[firstBlocks], 0)
+
+        if self.blockSize > 1:
+            headEnds = np.maximum(np.minimum(firstBlocks * self.blockSize, ends), starts)
+            tailStarts = np.maximum(lastBlocks * self.blockSize, headEnds)
+
+            for edgeStarts, edgeEnds in ((starts, headEnds), (tailStarts, ends)):
+                used = edgeEnds > edgeStarts
+                if used.any():
+                    result[used] += self.reduceWindows(edgeStarts[used], edgeEnds[used], transform, np.add)
+
+        return result
+
+    def peak(self, starts, ends):
+        """
+        Returns the biggest absolute value of the samples in every window [start, end)
+        """
+        return self.reduceWindows(starts, ends, np.abs, np.maximum).astype(np.float32)
+
+    def reduceWindows(self, starts, ends, transform, reducer):
+        """
+        Returns the samples of every window [start, end) changed by a transform and reduced by a ufunc, like np.maximum
+        """
+        result = np.zeros(len(starts), dtype=np.float64)
+        first = 0
+
+        # Decode the samples of a chunk of windows at once and reduce every window in it
+        while first < len(starts):
+            last = max(first + 1, int(np.searchsorted(ends, starts[first] + self.chunkSize, side="right")))
+
+            # Windows of different sizes are not always in order, the chunk covers all of them
+            firstSample = starts[first:last].min()
+            samples = transform(self.reader.decodeFrames(self.reader.wavMap.frames(firstSample, ends[first:last].max(), self.channel))[:, 0].astype(np.float64))
+            chunkStarts = starts[first:last] - firstSample
+            chunkEnds = ends[first:last] - firstSample
+
+            if np.all(chunkStarts[1:] >= chunkEnds[:-1]):
+                # Windows that do not overlap are reduced together, every other result is a gap between windows
+                indices = np.column_stack((chunkStarts, chunkEnds)).ravel()[:-1]
+                result[first:last] = reducer.reduceat(samples, indices)[::2]
+            else:
+                result[first:last] = [reducer.reduce(samples[start:end]) if end > start else 0.0 for start, end in zip(chunkStarts, chunkEnds)]
+
+            first = last
+
+        return result
+
+    def frameValues(self, rate, mode="rms", windowSize=None, smoothing=0, attack=0.0, release=0.0):
+        """
+        Returns the envelope of every animation frame. mode can be rms, mean or peak, windowSize is in samples
+        (by default one frame), smoothing is the width in frames of a moving average and
+        attack and release are the seconds that the value takes to go up and down
+        """
+        samplesPerFrame = float(self.reader.frameRate / exactRate(rate))
+        windowSize = int(windowSize or samplesPerFrame)
+
+        # The same frames as the spectrogram, the last ones are shorter
+        frameCount = self.reader.spectrogramLength(samplesPerFrame, windowSize)
+        starts = nearestSamples(np.arange(frameCount) * samplesPerFrame)
+        ends = np.minimum(starts + windowSize, self.reader.nFrames)
+
+        values = self.windowValues(starts, ends, mode)
+
+        if smoothing > 1:
+            values = np.convolve(values, np.ones(int(smoothing)) / int(smoothing), mode="same").astype(np.float32)
+
+        if attack or release:
+            values = self.follow(values, rate, attack, release)
+
+        return values
+
+    def valuesAt(self, positions, windowSize, mode="rms"):
+        """
+        Returns the envelope of the windows of windowSize samples that start on every sample position.
+        Positions are rounded to the nearest sample, windows outside the track are silent
+        """
+        starts = nearestSamples(positions)
+        ends = (starts + int(windowSize)).clip(0, self.reader.nFrames)
+        starts = starts.clip(0, self.reader.nFrames)
+
+        values = np.zeros(len(starts), dtype=np.float32)
+        inside = ends > starts
+        values[inside] = self.windowValues(starts[inside], ends[inside], mode)
+
+        return values
+
+    def windowValues(self, starts, ends, mode="rms"):
+        """
+        Returns the envelope of every window [start, end), mode can be rms, mean or peak
+        """
+        if mode == "rms":
+            return self.rms(starts, ends)
+        if mode == "mean":
+            return self.meanAbsolute(starts, ends)
+        if mode == "peak":
+            return self.peak(starts, ends)
+
+        raise ValueError('Unknown envelope mode "{}", use rms, mean or peak.'.format(mode))
+
+    def follow(self, values, rate, attack, release):
+        """
+        Makes the values rise and fall with the attack and release times of an envelope follower
+        """
+        attackCoefficient = np.exp(-1.0 / (attack * rate)) if attack > 0 else 0.0
+        releaseCoefficient = np.exp(-1.0 / (release * rate)) if release > 0 else 0.0
+
+        result = np.empty_like(values)
+        current = 0.0
+
+        for frame, value in enumerate(values.tolist()):
+            coefficient = attackCoefficient if value > current else releaseCoefficient
+            current = value + coefficient * (current - value)
+            result[frame] = current
+
+        return result
+
+class PeakPyramid:
+    """
+    This class keeps the minimum and maximum of the waveform at many resolutions. Level 0 has one value
+    every blockSize samples and every level has half the values of the previous one
+    """
+    def __init__(self, minimums, maximums, blockSize, nFrames):
+
+        self.minimums = minimums                # The minimums of every level, from the finest one
+        self.maximums = maximums                # The maximums of every level, from the finest one
+        self.blockSize = blockSize              # The samples of every value on level 0
+        self.nFrames = nFrames                  # The samples of the whole track
+
+    def level(self, samplesPerPixel):
+        """
+        Returns the coarsest level that still has at least one value for every pixel
+        """
+        level = 0
+        while level + 1 < len(self.minimums) and self.blockSize * 2 ** (level + 1) <= samplesPerPixel:
+            level += 1
+
+        return level
+
+    def columns(self, pixels, startSample=0, endSample=None):
+        """
+        Returns the minimum and maximum of every pixel column between two samples
+        """
+        endSample = self.nFrames if endSample is None else endSample
+        level = self.level(1.0 * (endSample - startSample) / pixels)
+        valueSize = self.blockSize * 2 ** level
+
+        # The values of the level that cover the range
+        firstValue = startSample // valueSize
+        lastValue = max(firstValue + 1, -(-endSample // valueSize))
+        minimums = self.minimums[level][firstValue:lastValue]
+        maximums = self.maximums[level][firstValue:lastValue]
+
+        if not len(minimums):
+            return np.zeros(pixels, dtype=np.float32), np.zeros(pixels, dtype=np.float32)
+
+        # Group the values of every column, when zoomed in past the level a value spreads over many columns
+        edges = np.minimum((np.arange(pixels) * len(minimums)) // pixels, len(minimums) - 1)
+        if len(minimums) >= pixels:
+            return np.minimum.reduceat(minimums, edges), np.maximum.reduceat(maximums, edges)
+
+        return minimums[edges], maximums[edges]
+
+def parseSource(source):
+    """
+    Returns the kind ("band" or "channel") and the number of a mapping source like "band 3" or "channel 2"
+    """
+    if source == "wave":
+        return "channel", 1
+
+    parts = source.split()
+
+    if len(parts) != 2 or parts[0] not in ("band", "channel") or not parts[1].isdigit():
+        raise ValueError('Unknown source "{}", use "wave", "band N" or "channel N".'.format(source))
+
+    return parts[0], int(parts[1])
+
+class WavReader:
+    """
+    This class is the responsible of managing the way the wav files open and their information
+    """
+    # Band filters shared by every reader, by window size, sample rate, band amount and scale
+    filterbanks = {}
+
+    # The amount of frames transformed together
+    batchFrames = 512
+
+    # Bigger spectrograms are streamed, only their bands are kept in memory
+    maxSpectrogramBytes = 256 * 1024**2
+
+    # The envelope sums of every channel, 16 bytes per sample. Longer tracks keep one sum every envelopeBlockSize samples
+    maxEnvelopeBytes = 256 * 1024**2
+    envelopeBlockSize = 1024
+
+    def __init__(self, filePath, cache=None):
+        
+        # Save the path to the file
+        self.fileName = filePath
+
+        # The disk cache with the results of earlier sessions
+        self.cache = cache
+        
+        # Map the wav file in memory
+        self.wavMap = WavMap(filePath)
+        
+        # Get the file's information
+        self.frameRate = self.wavMap.frameRate                      # The samples per second
+        self.nFrames = self.wavMap.nFrames                          # The total amount of samples
+        self.sampleWidth = self.wavMap.sampleWidth                  # The amount of bytes per sample
+        self.volume = 2**(8*self.sampleWidth-1) - 1                 # The max volume is equal to the max value that the sample can have
+        self.volume /= 1.0                                          # Conver to float
+
+        # Float files are already normalized
+        if self.wavMap.isFloat:
+            self.volume = 1.0
+
+        self.channels = self.wavMap.channels                        # The number of channels (mono / stereo)
+
+        self.windows = {}                                           # Window functions already built, by name and size
+        self.spectrograms = {}                                      # Magnitude spectrograms already computed, by their parameters
+        self.envelopes = {}                                         # The envelope of every channel, built the first time it is used
+        self.pyramids = {}                                          # The peak pyramid of every channel, built the first time it is used
+        
+    @measured("reader.sampleFrequency")
+    def sampleFrequency(self, rate, actualTime, bands=7, scale="linear"):
+        """
+        This function samples the frequency of the file at a specific time
+        """
+        # Calculate the positions where we want to sample
+        samples = 1.0 * self.frameRate / rate                       # The amount of samples per frame
+        startSample = samples * actualTime                          
+        endSample = startSample + samples
+
+        # Exit the function the endsample is greater than the last sample of the file
+        if endSample > self.nFrames:
+            return []
+        
+        # Get the range of samples
+        soundWave = self.sampleRange(int(startSample), int(endSample))
+
+        # Get only the first channel
+        soundWave = soundWave[:, 0]
+
+        # Calculate the magnitude spectrum of every sample in the frame
+        spectrum = self.fft(soundWave)
+
+        return self.bandEnergies(spectrum, len(soundWave), bands, scale).tolist()
+
+    @measured("reader.spectrogram")
+    def spectrogram(self, rate, bands=7, window="rectangular", hop=None, windowSize=None, scale="linear", progress=None):
+        """
+        Returns the bands of the spectrum for the whole file as an array of frames x bands.
+        progress is called with the fraction done after every batch
+        """
+        hop, windowSize = self.analysisSizes(rate, hop, windowSize)
+
+        # If the spectrum is not in memory the bands may be on disk, they are a lot smaller
+        params = {"hop": hop, "windowSize": windowSize, "window": window, "bands": bands, "scale": scale}
+        if self.cache and (hop, windowSize, window, 0) not in self.spectrograms:
+            cached = self.cache.load(self.fileName, "bands", params)
+
+            if cached is not None:
+                return cached["values"]
+
+        frameCount = self.spectrogramLength(hop, windowSize)
+
+        if self.loadSpectrogram(hop, windowSize, window, 0) is None and not self.spectrogramFits(hop, windowSize):
+            # The whole spectrum of a long file does not fit in memory, stream it and keep only the bands
+            result = np.empty((frameCount, bands), dtype=np.float32)
+
+            for firstFrame, block in self.iterSpectrogram(rate, window, hop, windowSize, bands=bands, scale=scale):
+                result[firstFrame:firstFrame + len(block)] = block
+
+                if progress:
+                    progress(1.0 * (firstFrame + len(block)) / frameCount)
+
+        else:
+            spectrum = self.magnitudeSpectrogram(rate, window, hop, windowSize, progress=progress)
+
+            # Changing the bands only needs a new filterbank, the spectrum is reused
+            result = self.bandEnergies(spectrum, windowSize, bands, scale)
+
+        if self.cache:
+            self.cache.save(self.fileName, "bands", params, values=result)
+
+        return result
+
+    def spectrogramFits(self, hop, windowSize):
+        """
+        Returns True if the whole magnitude spectrogram fits in maxSpectrogramBytes
+        """
+        return self.spectrogramLength(hop, windowSize) * (windowSize // 2 + 1) * 4 <= self.maxSpectrogramBytes
+
+    def analysisSizes(self, rate, hop=None, windowSize=None):
+        """
+        Returns the hop and window size in samples, by default both are one animation frame
+        """
+        samplesPerFrame = float(self.frameRate / exactRate(rate))
+        return hop or samplesPerFrame, int(windowSize or samplesPerFrame)
+
+    @measured("reader.magnitudeSpectrogram")
+    def magnitudeSpectrogram(self, rate, window="rectangular", hop=None, windowSize=None, channel=0, progress=None):
+        """
+        Computes the magnitude spectrum of every frame of the file in one pass.
+        By default there is one frame per animation frame, hop and windowSize are in samples
+        and the windows overlap when windowSize is bigger than hop.
+        progress is called with the fraction done after every batch
+        """
+        # By default hop one animation frame and use all of its samples
+        hop, windowSize = self.analysisSizes(rate, hop, windowSize)
+
+        # The spectrogram does not change unless its parameters do
+        cached = self.loadSpectrogram(hop, windowSize, window, channel)
+        if cached is not None:
+            return cached
+
+        if not self.spectrogramFits(hop, windowSize):
+            raise MemoryError("The spectrum of {} is bigger than maxSpectrogramBytes, use spectrogram to stream its bands".format(self.fileName))
+
+        frameCount = self.spectrogramLength(hop, windowSize)
+        result = np.empty((frameCount, windowSize // 2 + 1), dtype=np.float32)
+
+        for batchStart in xrange(0, frameCount, self.batchFrames):
+            batchEnd = min(batchStart + self.batchFrames, frameCount)
+            result[batchStart:batchEnd] = self.spectrogramFrames(batchStart, batchEnd, hop, windowSize, window, channel)
+
+            if progress:
+                progress(1.0 * batchEnd / frameCount)
+
+        self.storeSpectrogram(hop, windowSize, window, channel, result)
+        return result
+
+    def iterWindows(self, rate, hop=None, windowSize=None, channel=0, chunkSize=65536):
+        """
+        Yields the samples of every frame, decoding the file in chunks into a ring buffer of fixed size,
+        so the memory does not depend on the length of the file.
+        Every window is only valid until the next one is requested, copy it to keep it
+        """
+        hop, windowSize = self.analysisSizes(rate, hop, windowSize)
+        ringBuffer = RingBuffer(chunkSize + windowSize)
+
+        for frame in xrange(self.spectrogramLength(hop, windowSize)):
+            start = int(nearestSamples(frame * hop))
+
+            # Decode chunks until the whole window is in the buffer, the last windows are padded with silence
+            while ringBuffer.end < start + windowSize:
+                if ringBuffer.end < self.nFrames:
+                    chunkEnd = min(ringBuffer.end + chunkSize, self.nFrames)
+                    ringBuffer.extend(self.decodeFrames(self.wavMap.frames(ringBuffer.end, chunkEnd, channel))[:, 0])
+                else:
+                    ringBuffer.extend(np.zeros(start + windowSize - ringBuffer.end, dtype=np.float32))
+
+            yield ringBuffer.window(start, windowSize)
+
+    def iterSpectrogram(self, rate, window="rectangular", hop=None, windowSize=None, channel=0, bands=None, scale="linear", chunkSize=65536):
+        """
+        Yields the first frame and the magnitude spectrum (or the band energies if bands are given)
+        of every batch of frames, with the same values as the whole spectrogram but in bounded memory
+        """
+        hop, windowSize = self.analysisSizes(rate, hop, windowSize)
+        windowValues = self.getWindow(window, windowSize)
+
+        batch = np.empty((self.batchFrames, windowSize), dtype=np.float32)
+        firstFrame = 0
+        filled = 0
+
+        for frameWindow in self.iterWindows(rate, hop, windowSize, channel, chunkSize):
+            batch[filled] = frameWindow
+            filled += 1
+
+            if filled == self.batchFrames:
+                yield firstFrame, self.transformBatch(batch, windowValues, windowSize, bands, scale)
+                firstFrame += filled
+                filled = 0
+
+        if filled:
+            yield firstFrame, self.transformBatch(batch[:filled], windowValues, windowSize, bands, scale)
+
+    def transformBatch(self, batch, windowValues, windowSize, bands=None, scale="linear"):
+        """
+        Returns the magnitude spectrum or the band energies of a batch of windows
+        """
+        spectrum = self.fft(batch * windowValues)
+
+        if bands:
+            return self.bandEnergies(spectrum, windowSize, bands, scale)
+
+        return spectrum
+
+    def spectrogramLength(self, hop, windowSize):
+        """
+        Returns the amount of frames in the spectrogram, every frame that starts inside the track.
+        The windows of the last frames go past its end and are padded with silence
+        """
+        if not self.nFrames:
+            return 0
+
+        # Frame n starts on the nearest sample to n * hop, the estimate is checked with the same rounding
+        frameCount = int(np.ceil((self.nFrames - 0.5) / hop))
+
+        while frameCount > 0 and nearestSamples((frameCount - 1) * hop) >= self.nFrames:
+            frameCount -= 1
+
+        while nearestSamples(frameCount * hop) < self.nFrames:
+            frameCount += 1
+
+        return frameCount
+
+    def spectrogramFrames(self, firstFrame, lastFrame, hop, windowSize, window="rectangular", channel=0):
+        """
+        Returns the magnitude spectrum of the frames between two indices, frame n starts at the nearest sample to n * hop
+        """
+        starts = nearestSamples(np.arange(firstFrame, lastFrame) * hop)
+
+        if not len(starts):
+            return np.zeros((0, windowSize // 2 + 1), dtype=np.float32)
+
+        # Decode the samples of all the frames at once, padded with silence after the end of the track
+        firstSample = starts[0]
+        block = np.zeros(starts[-1] + windowSize - firstSample, dtype=np.float32)
+        lastSample = min(starts[-1] + windowSize, self.nFrames)
+        block[:lastSample - firstSample] = self.decodeFrames(self.wavMap.frames(firstSample, lastSample, channel))[:, 0]
+
+        # Gather every window in a matrix and transform all of them together
+        frames = block[(starts - firstSample)[:, np.newaxis] + np.arange(windowSize)] * self.getWindow(window, windowSize)
+        return self.fft(frames)
+
+    @measured("reader.spectrumAt")
+    def spectrumAt(self, positions, windowSize, bands, window="rectangular", scale="linear", channel=0):
+        """
+        Returns the band energies of the windows of windowSize samples that start on every sample position.
+        Positions are rounded to the nearest sample, the samples outside the track are silent
+        """
+        starts = nearestSamples(positions)
+        result = np.zeros((len(starts), bands), dtype=np.float32)
+        windowValues = self.getWindow(window, windowSize)
+
+        for batchStart in xrange(0, len(starts), self.batchFrames):
+            batch = starts[batchStart:batchStart + self.batchFrames]
+
+            # Decode the samples of the whole batch at once, padded with silence outside the track
+            firstSample, lastSample = batch.min(), batch.max() + windowSize
+            block = np.zeros(lastSample - firstSample, dtype=np.float32)
+            inside = slice(max(firstSample, 0), min(lastSample, self.nFrames))
+
+            if inside.stop > inside.start:
+                block[inside.start - firstSample:inside.stop - firstSample] = self.decodeFrames(self.wavMap.frames(inside.start, inside.stop, channel))[:, 0]
+
+            frames = block[(batch - firstSample)[:, np.newaxis] + np.arange(windowSize)]
+            result[batchStart:batchStart + len(batch)] = self.transformBatch(frames, windowValues, windowSize, bands, scale)
+
+        return result
+
+    def loadSpectrogram(self, hop, windowSize, window, channel):
+        """
+        Returns a spectrogram that was already computed, from memory or from the disk cache
+        """
+        key = (hop, windowSize, window, channel)
+        if key in self.spectrograms:
+            return self.spectrograms[key]
+
+        params = {"hop": hop, "windowSize": windowSize, "window": window, "channel": channel}
+        cached = self.cache.load(self.fileName, "spectrogram", params) if self.cache else None
+
+        if cached is not None:
+            self.spectrograms[key] = cached["values"]
+            return self.spectrograms[key]
+
+        return None
+
+    def storeSpectrogram(self, hop, windowSize, window, channel, result):
+        """
+        Keeps a computed spectrogram in memory and in the disk cache
+        """
+        if self.cache:
+            params = {"hop": hop, "windowSize": windowSize, "window": window, "channel": channel}
+            self.cache.save(self.fileName, "spectrogram", params, values=result)
+
+        self.spectrograms[(hop, windowSize, window, channel)] = result
+
+    def getWindow(self, window, size):
+        """
+        Returns the values of a window function, they are only built once for every size
+        """
+        key = (window, size)
+
+        if key not in self.windows:
+            functions = {"rectangular": np.ones, "hann": np.hanning, "hamming": np.hamming, "blackman": np.blackman}
+
+            if window not in functions:
+                raise ValueError('Unknown window "{}", use one of {}.'.format(window, sorted(functions)))
+
+            self.windows[key] = functions[window](size).astype(np.float32)
+
+        return self.windows[key]
+
+    @measured("reader.bandEnergies")
+    def bandEnergies(self, spectrum, windowSize, bands, scale="linear"):
+        """
+        Averages the spectrum inside every band, works on the last axis so it accepts many frames at once
+        """
+        filterbank = self.getFilterbank(windowSize, bands, scale)
+
+        if spectrum.ndim == 1:
+            return np.dot(spectrum, filterbank)
+
+        # Multiply in batches that start on multiples of batchFrames, the parallel analysis
+        # uses the same batches so both give exactly the same values
+        result = np.empty((len(spectrum), bands), dtype=np.float32)
+        for batchStart in xrange(0, len(spectrum), self.batchFrames):
+            result[batchStart:batchStart + self.batchFrames] = np.dot(spectrum[batchStart:batchStart + self.batchFrames], filterbank)
+
+        return result
+
+    def getFilterbank(self, windowSize, bands, scale="linear"):
+        """
+        Returns a matrix of frequency bins x bands that averages the bins of every band.
+        The scale can be linear, log (octave like) or mel
+        """
+        key = (windowSize, self.frameRate, bands, scale)
+
+        if key in self.filterbanks:
+            return self.filterbanks[key]
+
+        frequencies = np.fft.rfftfreq(windowSize, 1.0 / self.frameRate)
+        nyquist = frequencies[-1]
+
+        # The first bin is left out as it is (by experimenting) really high
+        lowest = frequencies[1] if len(frequencies) > 1 else 0.0
+
+        if scale == "linear":
+            edges = np.linspace(lowest, nyquist, bands + 1)
+        elif scale == "log":
+            edges = np.geomspace(max(lowest, 20.0), nyquist, bands + 1)
+        elif scale == "mel":
+            # Triangular filters, each one goes from the center of the previous band to the center of the next one
+            melEdges = np.linspace(self.toMel(lowest), self.toMel(nyquist), bands + 2)
+            edges = 700.0 * (10 ** (melEdges / 2595.0) - 1)
+        else:
+            raise ValueError('Unknown scale "{}", use linear, log or mel.'.format(scale))
+
+        filterbank = np.zeros((len(frequencies), bands), dtype=np.float32)
+
+        for band in xrange(bands):
+            if scale == "mel":
+                low, center, high = edges[band:band + 3]
+                rising = (frequencies - low) / (center - low)
+                falling = (high - frequencies) / (high - center)
+                weights = np.clip(np.minimum(rising, falling), 0, None)
+            else:
+                low, high = edges[band:band + 2]
+                weights = ((frequencies >= low) & (frequencies < high)).astype(np.float32)
+
+                # The last band includes the nyquist frequency
+                if band == bands - 1:
+                    weights[frequencies == high] = 1
+
+            # Bands narrower than a bin use the closest bin
+            if not weights.any():
+                weights[np.argmin(np.abs(frequencies - edges[band + 1 if scale == "mel" else band]))] = 1
+
+            filterbank[:, band] = weights / weights.sum()
+
+        self.filterbanks[key] = filterbank
+        return filterbank
+
+    def toMel(self, frequency):
+        """
+        Converts a frequency in hertz to the mel scale
+        """
+        return 2595.0 * np.log10(1 + frequency / 700.0)
+
+    def frameValues(self, rate, method="WaveForm", measure="point", bands=4, band=1, scale="linear", attack=0.0, release=0.0, channel=0):
+        """
+        Returns the value of every animation frame of the file, analyzed with the waveform of a channel
+        (measured on a point, or as RMS, mean or peak) or with one of the bands of the spectrum
+        """
+        if method == "Spectrum":
+            # Analyzes the frequencies of every frame at once
+            return self.spectrogram(rate, bands, scale=scale)[:, band - 1]
+
+        if method != "WaveForm":
+            raise ValueError('Unknown analyzing method "{}", use WaveForm or Spectrum.'.format(method))
+
+        if measure == "point":
+            # Analyzes only by frames
+            return self.sampleStepped(rate)[:, channel]
+
+        return self.envelope(rate, measure, attack=attack, release=release, channel=channel)
+
+    def sourceValues(self, rate, sources, measure="point", bands=4, scale="linear", attack=0.0, release=0.0):
+        """
+        Returns the value of every animation frame for every source, as a dictionary by source.
+        Sources are "band N" for a band of the spectrum and "channel N" (or "wave" for the first one)
+        for the waveform of a channel, measured like frameValues does.
+        The spectrum and every channel are analyzed once, however many sources use them
+        """
+        result = {}
+        spectrum = None
+
+        for source in sources:
+            if source in result:
+                continue
+
+            kind, number = parseSource(source)
+
+            if kind == "band":
+                if not 1 <= number <= bands:
+                    raise ValueError('There is no "{}", the spectrum has {} bands.'.format(source, bands))
+
+                if spectrum is None:
+                    spectrum = self.spectrogram(rate, bands, scale=scale)
+
+                result[source] = spectrum[:, number - 1]
+
+            else:
+                if not 1 <= number <= self.channels:
+                    raise ValueError('There is no "{}", the file has {} channels.'.format(source, self.channels))
+
+                result[source] = self.frameValues(rate, "WaveForm", measure, attack=attack, release=release, channel=number - 1)
+
+        return result
+
+    @measured("reader.timedValues")
+    def timedValues(self, timing, frames, sources, measure="point", bands=4, scale="linear", attack=0.0, release=0.0):
+        """
+        Returns the value of every source on frames of the scene placed on the track by a FrameTiming,
+        as a dictionary by source. Frames can be fractional and the frames outside the track are silent.
+        Sources and the measures are the same as sourceValues
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        indices = timing.wholeFrames(frames)
+
+        if indices is not None:
+            # Every frame is a frame of the analysis of the whole track, it may be cached or done in the background
+            frameValues = self.sourceValues(float(timing.fps), sources, measure, bands, scale, attack, release)
+            result = {}
+
+            for source, values in frameValues.items():
+                inside = (indices >= 0) & (indices < len(values))
+                result[source] = np.zeros(len(frames), dtype=np.float32)
+                result[source][inside] = values[indices[inside]]
+
+            return result
+
+        params = dict(timing.params(), first=float(frames[0]) if len(frames) else 0.0,
+                      last=float(frames[-1]) if len(frames) else 0.0, count=len(frames),
+                      sources=sorted(set(sources)), measure=measure, bands=bands, scale=scale, attack=attack, release=release)
+        cached = self.cache.load(self.fileName, "timed", params) if self.cache else None
+
+        if cached is not None:
+            return dict((source, cached["values"][:, index]) for index, source in enumerate(params["sources"]))
+
+        # The windows still last one frame, oversampled frames overlap
+        positions = timing.samplePositions(frames)
+        windowSize = int(timing.samplesPerFrame)
+        result = {}
+        spectrum = None
+
+        for source in params["sources"]:
+            kind, number = parseSource(source)
+
+            if kind == "band":
+                if not 1 <= number <= bands:
+                    raise ValueError('There is no "{}", the spectrum has {} bands.'.format(source, bands))
+
+                if spectrum is None:
+                    spectrum = self.spectrumAt(positions, windowSize, bands, scale=scale)
+
+                result[source] = spectrum[:, number - 1]
+                continue
+
+            if not 1 <= number <= self.channels:
+                raise ValueError('There is no "{}", the file has {} channels.'.format(source, self.channels))
+
+            if measure == "point":
+                result[source] = self.samplesAt(positions, number - 1)[:, 0]
+                continue
+
+            envelope = self.getEnvelope(number - 1)
+            result[source] = envelope.valuesAt(positions, windowSize, measure)
+
+            if attack or release:
+                result[source] = envelope.follow(result[source], timing.valuesPerSecond(), attack, release)
+
+        if self.cache and len(frames):
+            self.cache.save(self.fileName, "timed", params, values=np.column_stack([result[source] for source in params["sources"]]))
+
+        return result
+
+    @measured("reader.spectralFlux")
+    def spectralFlux(self, frameSeconds=0.01, windowSeconds=0.04, channel=0, bands=24):
+        """
+        Returns how much the spectrum grows between analysis frames that are frameSeconds apart.
+        The magnitudes are averaged in log spaced bands, so the noise of the bins of a band evens out and a kick
+        stands out in the low bands, and compressed, so quiet notes count as well as loud ones
+        """
+        params = {"frameSeconds": frameSeconds, "windowSeconds": windowSeconds, "channel": channel, "bands": bands}
+        cached = self.cache.load(self.fileName, "flux", params) if self.cache else None
+
+        if cached is not None:
+            return cached["values"]
+
+        hop = self.frameRate * frameSeconds
+        windowSize = int(self.frameRate * windowSeconds)
+        frameCount = self.spectrogramLength(hop, windowSize)
+
+        result = np.zeros(frameCount, dtype=np.float64)
+        previous = None
+
+        # The first bin of every band, without the constant bin
+        binCount = windowSize // 2 + 1
+        edges = np.unique(np.round(np.geomspace(1, binCount, bands + 1)).astype(np.int64))
+
+        # Batch by batch, the spectrum of the whole file is never kept
+        for batchStart in xrange(0, frameCount, self.batchFrames):
+            batchEnd = min(batchStart + self.batchFrames, frameCount)
+            magnitudes = self.spectrogramFrames(batchStart, batchEnd, hop, windowSize, "hann", channel)
+            spectrum = np.log1p(100.0 * np.add.reduceat(magnitudes, edges[:-1], axis=1) / np.diff(edges))
+
+            # Only the frequencies that got louder count
+            if previous is not None:
+                spectrum = np.concatenate((previous, spectrum))
+            growth = np.diff(spectrum, axis=0).clip(0).sum(axis=1)
+
+            result[batchEnd - len(growth):batchEnd] = growth
+            previous = spectrum[-1:]
+
+        if self.cache:
+            self.cache.save(self.fileName, "flux", params, values=result)
+
+        return result
+
+    def onsetDetector(self, frameSeconds=0.01, windowSeconds=0.04, channel=0):
+        """
+        Returns the detector of the onsets and beats of the file
+        """
+        # Every frame of the flux stands for the middle of its window
+        return OnsetDetector(self.spectralFlux(frameSeconds, windowSeconds, channel), frameSeconds, 0.5 * windowSeconds)
+
+    @measured("reader.envelope")
+    def envelope(self, rate, mode="rms", windowSize=None, smoothing=0, attack=0.0, release=0.0, channel=0):
+        """
+        Returns the loudness of every frame, an alternative to sampleStepped that does not alias.
+        See Envelope.frameValues for the parameters
+        """
+        params = {"rate": rate, "mode": mode, "windowSize": windowSize, "smoothing": smoothing,
+                  "attack": attack, "release": release, "channel": channel}
+        cached = self.cache.load(self.fileName, "envelope", params) if self.cache else None
+
+        if cached is not None:
+            return cached["values"]
+
+        result = self.getEnvelope(channel).frameValues(rate, mode, windowSize, smoothing, attack, release)
+
+        if self.cache:
+            self.cache.save(self.fileName, "envelope", params, values=result)
+
+        return result
+
+    def getEnvelope(self, channel):
+        """
+        Returns the envelope of a channel, built the first time. It keeps a sum for every sample while the sums
+        of every channel fit in maxEnvelopeBytes, and one every envelopeBlockSize samples after that
+        """
+        if channel not in self.envelopes:
+            keptBytes = sum(envelope.squares.nbytes + envelope.absolutes.nbytes for envelope in self.envelopes.values())
+            blockSize = 1 if keptBytes + 16 * (self.nFrames + 1) <= self.maxEnvelopeBytes else self.envelopeBlockSize
+            self.envelopes[channel] = Envelope(self, channel, blockSize=blockSize)
+
+        return self.envelopes[channel]
+
+    @measured("reader.peakPyramid")
+    def peakPyramid(self, channel=0, blockSize=256, chunkSize=1048576):
+        """
+        Returns the minimum and maximum of the waveform at many resolutions, to draw it at any zoom
+        """
+        if channel in self.pyramids:
+            return self.pyramids[channel]
+
+        params = {"channel": channel, "blockSize": blockSize}
+        cached = self.cache.load(self.fileName, "peaks", params) if self.cache else None
+
+        if cached is not None:
+            levels = len(cached) // 2
+            minimums = [cached["min{}".format(level)] for level in xrange(levels)]
+            maximums = [cached["max{}".format(level)] for level in xrange(levels)]
+
+        else:
+            blockCount = -(-self.nFrames // blockSize)
+            minimums = [np.zeros(blockCount, dtype=np.float32)]
+            maximums = [np.zeros(blockCount, dtype=np.float32)]
+
+            # Level 0, decoded in chunks that are a multiple of the block size
+            chunkSize = max(blockSize, chunkSize - chunkSize % blockSize)
+            for start in xrange(0, self.nFrames, chunkSize):
+                samples = self.decodeFrames(self.wavMap.frames(start, start + chunkSize, channel))[:, 0]
+
+                # Repeat the last sample so the last block is complete
+                padding = -len(samples) % blockSize
+                samples = np.concatenate((samples, np.repeat(samples[-1:], padding))).reshape(-1, blockSize)
+
+                minimums[0][start // blockSize:start // blockSize + len(samples)] = samples.min(axis=1)
+                maximums[0][start // blockSize:start // blockSize + len(samples)] = samples.max(axis=1)
+
+            # Every level joins the values of the previous one in pairs
+            while len(minimums[-1]) > 1:
+                previousMinimums = minimums[-1]
+                previousMaximums = maximums[-1]
+
+                if len(previousMinimums) % 2:
+                    previousMinimums = np.append(previousMinimums, previousMinimums[-1])
+                    previousMaximums = np.append(previousMaximums, previousMaximums[-1])
+
+                minimums.append(previousMinimums.reshape(-1, 2).min(axis=1))
+                maximums.append(previousMaximums.reshape(-1, 2).max(axis=1))
+
+            if self.cache:
+                arrays = {}
+                for level in xrange(len(minimums)):
+                    arrays["min{}".format(level)] = minimums[level]
+                    arrays["max{}".format(level)] = maximums[level]
+
+                self.cache.save(self.fileName, "peaks", params, **arrays)
+
+        self.pyramids[channel] = PeakPyramid(minimums, maximums, blockSize, self.nFrames)
+        return self.pyramids[channel]
+
+    @measured("reader.decode")
+    def decodeFrames(self, view):
+        """
+        Converts a view of raw samples into a normalized float32 array of shape (frames, channels)
+        """
+        if self.sampleWidth == 1:
+            # 8 bit files are unsigned, center them around zero
+            values = view.astype(np.float32) - 128
+
+        elif self.sampleWidth == 3:
+            # Join the three little-endian bytes, the top one is signed so it keeps the sign
+            values = (view[..., 0].astype(np.int32) | view[..., 1].astype(np.int32) << 8 |
+                      view[..., 2].view(np.int8).astype(np.int32) << 16).astype(np.float32)
+
+        else:
+            values = view.astype(np.float32)
+
+        # Normalize the values
+        values /= self.volume
+        return values
+
+    def sampleRange(self, startFrame, endFrame):
+        """
+        Returns the samples in the file between a certain range
+        """
+        return self.decodeFrames(self.wavMap.frames(startFrame, endFrame))
+
+    @measured("reader.sampleStepped")
+    def sampleStepped(self, rate):
+        """
+        This function looks for samples in the sound that fit the spacing between frames
+        """
+        stepPerFrame = self.frameRate / exactRate(rate)
+
+        params = {"step": int(stepPerFrame) if stepPerFrame.denominator == 1 else float(stepPerFrame)}
+        cached = self.cache.load(self.fileName, "stepped", params) if self.cache else None
+
+        if cached is not None:
+            return cached["values"]
+
+        if stepPerFrame.denominator == 1:
+            # Only the frames that fit the step are decoded, the rest of the file is never touched
+            result = self.decodeFrames(self.wavMap.frames()[::int(stepPerFrame)])
+        else:
+            # Frames fall between samples, every frame is interpolated at its exact position
+            frameCount = int(np.ceil(self.nFrames / float(stepPerFrame)))
+            result = self.samplesAt(np.arange(frameCount) * float(stepPerFrame))
+
+        if self.cache:
+            self.cache.save(self.fileName, "stepped", params, values=result)
+
+        return result
+
+    @measured("reader.samplesAt")
+    def samplesAt(self, positions, channel=None):
+        """
+        Returns the samples at fractional positions as an array of positions x channels (or only one channel),
+        interpolated between the samples around every position. Positions outside the track are silent
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        below = np.floor(positions)
+        fractions = (positions - below).astype(np.float32)[:, np.newaxis]
+        below = below.astype(np.int64)
+
+        # Only the two samples around every position are decoded
+        samples = self.wavMap.samples if channel is None else self.wavMap.samples[:, channel:channel + 1]
+        first = self.decodeFrames(samples[below.clip(0, self.nFrames - 1)])
+        second = self.decodeFrames(samples[(below + 1).clip(0, self.nFrames - 1)])
+
+        first[(below < 0) | (below >= self.nFrames)] = 0
+        second[(below + 1 < 0) | (below + 1 >= self.nFrames)] = 0
+
+        return first + (second - first) * fractions
+
+    def residentBytes(self):
+        """
+        Returns the bytes of the analysis kept in memory: spectrograms, envelopes and peak pyramids
+        """
+        arrays = list(self.spectrograms.values())
+        arrays += [array for envelope in self.envelopes.values() for array in (envelope.squares, envelope.absolutes)]
+        arrays += [array for pyramid in self.pyramids.values() for array in pyramid.minimums + pyramid.maximums]
+
+        return sum(array.nbytes for array in arrays)
+
+    def releaseBuffers(self):
+        """
+        Forgets the analysis kept in memory, it is computed again (or loaded from the disk cache) when needed
+        """
+        self.spectrograms.clear()
+        self.envelopes.clear()
+        self.pyramids.clear()
+
+    def close(self):
+        """
+        Releases the mapped file
+        """
+        self.wavMap.close()
+
+    @measured("reader.fft")
+    def fft(self, values):
+        """
+        Returns the magnitude spectrum of real values, any amount of values can be used
+        """
+        # NumPy's real transform works for every size, so no samples are thrown away
+        return np.abs(np.fft.rfft(values, axis=-1))
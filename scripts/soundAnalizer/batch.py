@@ -0,0 +1,400 @@
+"""
+Bakes the animation of many shots without the window, on mayapy and a pool of processes:
+
+    mayapy -m soundAnalizer.batch manifest.json --workers 4 --report report.json
+
+The manifest is a JSON file with the jobs to run and the values they share:
+
+    {
+        "defaults": {"fps": 24, "mode": "Spectrum", "bands": 4, "multiplier": 5},
+        "jobs": [
+            {"name": "sh010", "wav": "audio/song.wav", "scene": "scenes/sh010.ma", "output": "baked/sh010.ma",
+             "mappings": [{"object": "pCube1", "attributes": ["translateY", "scaleY"]}, "pSphere1.rotateX"],
+             "band": 2, "start": 1, "end": 240, "tolerance": 0.05},
+            {"name": "sh020", "wav": "audio/song.wav", "export": "curves/sh020.atom",
+             "mappings": [{"object": "bar1", "attributes": ["scaleY"], "source": "band 1"},
+                          {"object": "bar2", "attributes": ["scaleY"], "source": "band 2", "multiplier": 8},
+                          {"object": "light", "attributes": ["intensity"], "source": "channel 2"}]}
+        ]
+    }
+
+Frame "offset" (1 by default) plays the first sample of the track, like the offset of an audio node, and
+"oversample" keys that many values on every frame. Any fps works, 23.976 or 29.97 are the exact NTSC rates.
+
+A mapping drives its attributes from the band of the job (Spectrum mode) or the first channel (WaveForm mode),
+or from its own "source": "band N", "channel N" or "wave", with its own multiplier.
+
+Every track is analyzed once, before the jobs are sent to the pool. A job with a scene keys it and saves it
+to its output (or over itself), a job with an export writes its curves as .json or .atom, with or without a scene.
+Paths are relative to the manifest
+"""
+import os, os.path, sys, json, time, argparse, traceback, collections
+
+from .lazy import LazyModule
+from .cache import AnalysisCache
+from .analysis import WavReader
+from .timing import FrameTiming
+from .scene import CurveWriter
+from .reduction import reduceKeys
+
+np = LazyModule("numpy")
+
+# The value of every option a job does not set
+JOB_DEFAULTS = {"name": None, "scene": None, "output": None, "export": None, "mappings": [],
+                "mode": "WaveForm", "measure": "point", "bands": 4, "band": 1, "scale": "linear",
+                "attack": 0.0, "release": 0.0, "multiplier": 1.0, "tolerance": 0.0, "fps": 24, "offset": 1.0, "oversample": 1,
+                "start": 1, "end": None, "relative": True}
+
+# The options that change the analysis, jobs that share them and a source share its values
+ANALYSIS_OPTIONS = ("fps", "offset", "oversample", "measure", "bands", "scale", "attack", "release")
+
+# The options that are paths relative to the manifest
+PATH_OPTIONS = ("wav", "scene", "output", "export")
+
+# Maya's names for the usual frame rates
+TIME_UNITS = {15: "game", 24: "film", 25: "pal", 30: "ntsc", 48: "show", 50: "palf", 60: "ntscf"}
+
+# The .atom output of the attributes that have units, when the scene cannot be asked
+LINEAR_ATTRIBUTES = ("translateX", "translateY", "translateZ", "tx", "ty", "tz")
+ANGULAR_ATTRIBUTES = ("rotateX", "rotateY", "rotateZ", "rx", "ry", "rz")
+
+def loadManifest(path):
+    """
+    Returns the jobs of a manifest with their defaults filled in and their paths made absolute
+    """
+    with open(path) as fileObject:
+        manifest = json.load(fileObject)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    jobs = []
+
+    for index, entry in enumerate(manifest.get("jobs", [])):
+        job = dict(JOB_DEFAULTS)
+        job.update(manifest.get("defaults", {}))
+        job.update(entry)
+
+        unknown = set(job) - set(JOB_DEFAULTS) - set(["wav"])
+        if unknown:
+            raise ValueError("Job {} has unknown options: {}".format(index, ", ".join(sorted(unknown))))
+
+        if not job.get("wav"):
+            raise ValueError("Job {} has no wav file".format(index))
+
+        if not job["scene"] and not job["export"]:
+            raise ValueError("Job {} needs a scene to bake or an export file".format(index))
+
+        if not job["mappings"]:
+            raise ValueError("Job {} has no attributes to animate".format(index))
+
+        if job["mode"] not in ("WaveForm", "Spectrum"):
+            raise ValueError('Job {} has an unknown mode "{}", use WaveForm or Spectrum'.format(index, job["mode"]))
+
+        for option in PATH_OPTIONS:
+            if job.get(option):
+                job[option] = os.path.normpath(os.path.join(directory, job[option]))
+
+        job["name"] = job["name"] or "job{}".format(index)
+        jobs.append(job)
+
+    return jobs
+
+def jobMappings(job):
+    """
+    Returns every attribute a job animates with its source and multiplier.
+    Mappings are "object.attribute" or an object with its attributes and optionally their source and multiplier
+    """
+    defaultSource = "band {}".format(job["band"]) if job["mode"] == "Spectrum" else "wave"
+    mappings = []
+
+    for mapping in job["mappings"]:
+        if isinstance(mapping, dict):
+            source = mapping.get("source", defaultSource)
+            multiplier = mapping.get("multiplier", job["multiplier"])
+            mappings.extend((mapping["object"] + "." + attribute, source, multiplier) for attribute in mapping["attributes"])
+        else:
+            mappings.append((mapping, defaultSource, job["multiplier"]))
+
+    return mappings
+
+def analyzeJobs(jobs, cache=None):
+    """
+    Returns the frames and their values of every source for every job, as a dictionary by source.
+    The frames go from frame 1 to the end of the track. Each track is read once and each source is computed once for every combination of analysis options.
+    The values of a job whose track cannot be analyzed are the error instead
+    """
+    readers = {}
+    analyzed = {}
+    values = []
+
+    try:
+        for job in jobs:
+            key = (job["wav"],) + tuple(job[option] for option in ANALYSIS_OPTIONS)
+            sources = set(source for plug, source, multiplier in jobMappings(job))
+
+            try:
+                if job["wav"] not in readers:
+                    readers[job["wav"]] = WavReader(job["wav"], cache)
+
+                # Every source that is missing is analyzed at once, so they share the spectrum
+                missing = [source for source in sources if key + (source,) not in analyzed]
+                if missing:
+                    reader = readers[job["wav"]]
+                    timing = FrameTiming(reader.frameRate, job["fps"], job["offset"], 0.0, job["oversample"])
+                    frames = timing.frames(1, timing.framesAt(1.0 * reader.nFrames / reader.frameRate), reader.nFrames)
+
+                    sourceValues = reader.timedValues(timing, frames, missing, job["measure"], job["bands"],
+                                                      job["scale"], job["attack"], job["release"])
+                    for source, frameValues in sourceValues.items():
+                        analyzed[key + (source,)] = (frames, np.asarray(frameValues, dtype=np.float64))
+
+                values.append(dict((source, analyzed[key + (source,)]) for source in sources))
+
+            except Exception:
+                values.append(traceback.format_exc())
+
+    finally:
+        for reader in readers.values():
+            reader.close()
+
+    return values
+
+def initializeMaya():
+    """
+    Returns maya.cmds, starting Maya in this process if it is not running yet
+    """
+    from maya import cmds
+
+    # Before Maya starts the commands module is empty
+    if not hasattr(cmds, "file"):
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+
+    return cmds
+
+def bakeJob(job, values):
+    """
+    Keys the scene of a job and writes its export, returns the curves as times and values by attribute.
+    values are the frames and their values of every source of the job
+    """
+    cmds = None
+    end = job["end"]
+
+    if job["scene"]:
+        cmds = initializeMaya()
+        cmds.file(job["scene"], open=True, force=True)
+
+        # The keys are set in the units of the scene, the analysis has to match them
+        from maya import mel
+        sceneRate = mel.eval("currentTimeUnitToFPS()")
+
+        if abs(sceneRate - job["fps"]) > 1e-6:
+            raise ValueError("The scene runs at {} fps but the job was analyzed at {} fps".format(sceneRate, job["fps"]))
+
+        if end is None:
+            end = int(cmds.playbackOptions(query=True, maxTime=True))
+
+    # Only straight lines between the keys are sure to stay within the tolerance
+    tangent = "linear" if job["tolerance"] > 0 else None
+
+    keys = {}
+    curves = collections.OrderedDict()
+
+    for plug, source, multiplier in jobMappings(job):
+
+        # Attributes with the same source and multiplier share their keys
+        if (source, multiplier) not in keys:
+            frames, frameValues = values[source]
+
+            # Key from the start frame until the timeline or the track is finished
+            inside = (frames >= job["start"]) & (frames <= (np.inf if end is None else end))
+            times = frames[inside]
+            soundValues = frameValues[inside] * multiplier
+
+            # Drop the keys the curves do not need
+            if tangent:
+                kept = reduceKeys(times, soundValues, job["tolerance"])
+                times, soundValues = times[kept], soundValues[kept]
+
+            keys[(source, multiplier)] = (times, soundValues)
+
+        times, soundValues = keys[(source, multiplier)]
+        originalValue = cmds.getAttr(plug) if cmds and job["relative"] else 0.0
+        curves[plug] = (times, soundValues + originalValue)
+
+    if cmds:
+        writer = CurveWriter(cmds)
+        for plug, (curveTimes, curveValues) in curves.items():
+            writer.writeCurve(plug, curveTimes, curveValues, tangents=[(tangent, tangent)] * len(curveTimes) if tangent else None)
+
+        output = job["output"] or job["scene"]
+        makeDirectory(output)
+        cmds.file(rename=output)
+        cmds.file(save=True, force=True, type="mayaAscii" if output.lower().endswith(".ma") else "mayaBinary")
+
+    if job["export"]:
+        units = dict((plug, attributeUnit(plug, cmds)) for plug in curves)
+        exportCurves(job["export"], curves, job["fps"], units, job["scene"], tangent or "auto")
+
+    return curves
+
+def runJob(arguments):
+    """
+    Runs a job in a process of the pool, returns a summary of how it went.
+    A failing job does not stop the others
+    """
+    job, values = arguments
+    start = time.time()
+
+    if isinstance(values, str):
+        return {"name": job["name"], "status": "failed", "seconds": 0.0, "error": values}
+
+    try:
+        curves = bakeJob(job, values)
+        return {"name": job["name"], "status": "done", "curves": len(curves), "seconds": time.time() - start,
+                "keys": sum(len(times) for times, curveValues in curves.values())}
+
+    except Exception:
+        return {"name": job["name"], "status": "failed", "seconds": time.time() - start, "error": traceback.format_exc()}
+
+def runJobs(jobs, values, workers=None):
+    """
+    Runs every job on a pool of processes and returns their summaries in the order of the jobs
+    """
+    tasks = list(zip(jobs, values))
+
+    # Only the jobs that key scenes need Maya, and only those are worth a process
+    if workers == 1 or sum(1 for job in jobs if job["scene"]) <= 1:
+        return [runJob(task) for task in tasks]
+
+    # The process modules are only loaded when a pool is used
+    import multiprocessing
+
+    pool = multiprocessing.Pool(min(workers or multiprocessing.cpu_count(), len(tasks)))
+
+    try:
+        # Every job opens its own scene, they are big enough to go one by one
+        return pool.map(runJob, tasks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+def attributeUnit(plug, cmds=None):
+    """
+    Returns whether an attribute is linear, angular or unitless, asking the scene when there is one
+    """
+    if cmds:
+        return {"doubleLinear": "linear", "doubleAngle": "angular"}.get(cmds.getAttr(plug, type=True), "unitless")
+
+    attribute = plug.split(".")[-1]
+    if attribute in LINEAR_ATTRIBUTES:
+        return "linear"
+    if attribute in ANGULAR_ATTRIBUTES:
+        return "angular"
+
+    return "unitless"
+
+def makeDirectory(path):
+    """
+    Creates the folder of a file if it does not exist
+    """
+    directory = os.path.dirname(path)
+
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+def exportCurves(path, curves, fps, units=None, scene=None, tangent="auto"):
+    """
+    Writes curves as times and values by attribute to a .json or .atom file,
+    the .atom keys get the tangent type given
+    """
+    makeDirectory(path)
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".json":
+        data = {"fps": fps, "scene": scene, "curves": dict((plug, {"times": times.tolist(), "values": values.tolist()})
+                                                         for plug, (times, values) in curves.items())}
+        with open(path, "w") as fileObject:
+            json.dump(data, fileObject)
+
+    elif extension == ".atom":
+        writeAtom(path, curves, fps, units or {}, scene, tangent)
+
+    else:
+        raise ValueError('Unknown export format "{}", use .json or .atom.'.format(extension))
+
+def writeAtom(path, curves, fps, units, scene=None, tangent="auto"):
+    """
+    Writes curves in the text format of Maya's atomImport, one node block per object
+    """
+    frames = [frame for curveTimes, values in curves.values() for frame in (curveTimes[:1].tolist() + curveTimes[-1:].tolist())]
+
+    lines = ["atomVersion 1.0;",
+             "mayaVersion 2018;",
+             "mayaSceneFile {};".format(scene or ""),
+             "timeUnit {};".format(TIME_UNITS.get(fps, "{}fps".format(fps))),
+             "linearUnit cm;",
+             "angularUnit deg;",
+             "startTime {};".format(min(frames) if frames else 0),
+             "endTime {};".format(max(frames) if frames else 0)]
+
+    # Group the attributes by object, in the order they were given
+    objects = []
+    for plug in curves:
+        node = plug.split(".")[0]
+        if node not in objects:
+            objects.append(node)
+
+    for node in objects:
+        lines += ["dagNode {", "\t{} 0 0;".format(node)]
+
+        for index, plug in enumerate(plug for plug in curves if plug.split(".")[0] == node):
+            attribute = plug.split(".", 1)[1]
+            curveTimes, values = curves[plug]
+
+            lines += ["\tanim {0} {0} 0 0 {1};".format(attribute, index),
+                      "\tanimData {",
+                      "\t\tinput time;",
+                      "\t\toutput {};".format(units.get(plug, "unitless")),
+                      "\t\tweighted 0;",
+                      "\t\tpreInfinity constant;",
+                      "\t\tpostInfinity constant;",
+                      "\t\tkeys {"]
+            lines += ["\t\t\t{0} {1!r} {2} {2} 1 0 0;".format(frame, value, tangent) for frame, value in zip(curveTimes.tolist(), values.tolist())]
+            lines += ["\t\t}", "\t}"]
+
+        lines.append("}")
+
+    with open(path, "w") as fileObject:
+        fileObject.write("\n".join(lines) + "\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", help="the JSON file with the jobs")
+    parser.add_argument("--workers", type=int, help="processes keying scenes at once, all the cores by default")
+    parser.add_argument("--report", help="where to save the summary of every job as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="do not load or save the analysis on disk")
+    args = parser.parse_args(argv)
+
+    jobs = loadManifest(args.manifest)
+
+    start = time.time()
+    values = analyzeJobs(jobs, None if args.no_cache else AnalysisCache())
+    sys.stdout.write("Analyzed {} tracks in {:.2f}s\n".format(len(set(job["wav"] for job in jobs)), time.time() - start))
+
+    summaries = runJobs(jobs, values, args.workers)
+
+    for summary in summaries:
+        if summary["status"] == "done":
+            sys.stdout.write("{name}: {curves} curves, {keys} keys in {seconds:.2f}s\n".format(**summary))
+        else:
+            sys.stdout.write("{name}: failed\n{error}".format(**summary))
+
+    if args.report:
+        with open(args.report, "w") as fileObject:
+            json.dump(summaries, fileObject, indent=2)
+
+    return 1 if any(summary["status"] != "done" for summary in summaries) else 0
+
+# The processes of the pool import this module again, only the one that was started runs the jobs
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Keeps the results of the analysis on disk between sessions
+"""
+import os, os.path, hashlib, json, tempfile
+
+from .lazy import LazyModule
+from .profiling import measured
+
+np = LazyModule("numpy")
+
+class AnalysisCache:
+    """
+    This class keeps the results of the analysis on disk, so files that were already analyzed
+    load in milliseconds in later sessions
+    """
+    version = 2         # Changes when the analysis gives other values, the entries of an older version are never loaded
+
+    def __init__(self, directory=None, maxBytes=1024**3):
+
+        # The folder that keeps the entries and the size they can use before the oldest ones are deleted
+        self.directory = directory or os.path.join(os.path.expanduser("~"), ".mayaSoundAnalizer", "cache")
+        self.maxBytes = maxBytes
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def fileKey(self, filePath):
+        """
+        Returns a key for the path of the file and another one for its content (size and modification time)
+        """
+        realPath = os.path.realpath(filePath)
+        stat = os.stat(realPath)
+
+        pathKey = hashlib.sha1(realPath.encode("utf-8")).hexdigest()[:16]
+        stateKey = hashlib.sha1("{}:{}".format(stat.st_size, stat.st_mtime).encode("utf-8")).hexdigest()[:8]
+
+        return pathKey, stateKey
+
+    def entryPath(self, filePath, kind, params):
+        """
+        Returns the path of the entry for a kind of analysis of a file with certain parameters
+        """
+        pathKey, stateKey = self.fileKey(filePath)
+        paramsKey = hashlib.sha1(json.dumps([self.version, params], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+        return os.path.join(self.directory, "{}-{}-{}-{}.npz".format(pathKey, stateKey, kind, paramsKey))
+
+    @measured("cache.load")
+    def load(self, filePath, kind, params):
+        """
+        Returns the arrays saved for this analysis as a dictionary, or None if they are not on disk
+        """
+        path = self.entryPath(filePath, kind, params)
+
+        if not os.path.exists(path):
+            return None
+
+        # NumPy reads the entries with zipfile, it is loaded by then
+        import zipfile
+
+        try:
+            with np.load(path) as data:
+                arrays = dict((name, data[name]) for name in data.files)
+        except (IOError, ValueError, zipfile.BadZipfile):
+            # A broken entry is the same as a missing one
+            self.remove(path)
+            return None
+
+        # Touch the entry so it is the last one to be evicted, unless another save has just replaced it
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return arrays
+
+    @measured("cache.save")
+    def save(self, filePath, kind, params, **arrays):
+        """
+        Saves the arrays of an analysis and evicts the least recently used entries if the cache is too big.
+        The cache is only a shortcut, an entry that cannot be written is not saved and no error is raised
+        """
+        try:
+            self.write(self.entryPath(filePath, kind, params), arrays)
+        except (IOError, OSError):
+            pass
+
+    def write(self, path, arrays):
+        """
+        Writes the arrays of an entry, replacing it in a single step
+        """
+        pathKey, stateKey = os.path.basename(path).split("-")[:2]
+
+        # Entries of an older version of the same file will never be used again
+        for name in os.listdir(self.directory):
+            if name.startswith(pathKey + "-") and not name.startswith("{}-{}-".format(pathKey, stateKey)):
+                self.remove(os.path.join(self.directory, name))
+
+        # Write to a temporary file of its own first so a half written entry is never loaded, the background analysis,
+        # the window and the audioFeature nodes can save the same entry at the same time
+        descriptor, temporaryPath = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(descriptor, "wb") as fileObject:
+                np.savez_compressed(fileObject, **arrays)
+
+            self.replace(temporaryPath, path)
+        except Exception:
+            self.remove(temporaryPath)
+            raise
+
+        self.trim()
+
+    def replace(self, sourcePath, path):
+        """
+        Moves a file over an entry in a single step, so loads see the old entry or the new one
+        """
+        if hasattr(os, "replace"):
+            os.replace(sourcePath, path)
+        else:
+            # Python 2 on Windows cannot rename over a file, a save that loses the race to another one keeps its entry
+            self.remove(path)
+            os.rename(sourcePath, path)
+
+    def trim(self):
+        """
+        Deletes the least recently used entries until the cache fits in its maximum size
+        """
+        entries = []
+
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                path = os.path.join(self.directory, name)
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Replaced or evicted by another save
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        totalBytes = sum(entry[1] for entry in entries)
+
+        for lastUse, size, path in sorted(entries):
+            if totalBytes <= self.maxBytes:
+                break
+
+            self.remove(path)
+            totalBytes -= size
+
+    def invalidate(self, filePath=None):
+        """
+        Deletes every entry of a file, or the whole cache if no file is given
+        """
+        prefix = self.fileKey(filePath)[0] + "-" if filePath else ""
+
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(".npz"):
+                self.remove(os.path.join(self.directory, name))
+
+    def remove(self, path):
+        """
+        Deletes an entry, ignoring the ones that are already gone
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,8 @@
+"""
+Names that differ between the Python 2 and Python 3 versions of Maya
+"""
+try:
+    xrange = xrange
+except NameError:
+    # Python 3 Maya versions
+    xrange = range
@@ -0,0 +1,128 @@
+"""
+Looks up the analysis of a track on any frame, for nodes that drive attributes without keys.
+It does not need Maya, the audioFeature plug-in only reads its attributes and calls lookup
+"""
+import collections, math, threading, time
+
+from .compat import xrange
+from .lazy import LazyModule
+from .analysis import parseSource
+from .registry import readerRegistry
+
+np = LazyModule("numpy")
+
+# The options of the enum attributes of the audioFeature node, in the order of their values
+MODES = ("WaveForm", "Spectrum")
+MEASURES = ("point", "rms", "mean", "peak")
+SCALES = ("linear", "log", "mel")
+
+class FeatureLookup:
+    """
+    This class keeps the value of every frame of the tracks and sources that are looked up, so after the first
+    lookup every frame costs the same: an index into an array. A track that changes on disk is analyzed again,
+    files are checked on disk at most once every statInterval seconds
+    """
+    def __init__(self, registry=None, cache=None, maxFeatures=64, statInterval=1.0):
+
+        self.registry = registry or readerRegistry          # Where the readers of the tracks come from
+        self.cache = cache                                  # The disk cache of the analysis, if any
+        self.maxFeatures = maxFeatures                      # The analyses kept, the least recently used go first
+        self.statInterval = statInterval                    # The seconds a file key is trusted before checking the file again
+        self.features = collections.OrderedDict()           # The value of every frame, by file and analysis options, the least recently used first
+        self.fileKeys = {}                                  # The file key of every path, with the time it was checked
+        self.trackLocks = {}                                # A lock for every file key, so one track is analyzed once, they are kept until clear
+        self.lock = threading.Lock()                        # Maya can evaluate nodes on many threads
+
+    def fileKey(self, filePath):
+        """
+        Returns the file key of a path (see ReaderRegistry.fileKey), checking the file only when it is older than statInterval
+        """
+        now = time.time()
+        checked = self.fileKeys.get(filePath)
+
+        if checked is None or now - checked[1] > self.statInterval:
+            checked = (self.registry.fileKey(filePath), now)
+            self.fileKeys[filePath] = checked
+
+        return checked[0]
+
+    def values(self, filePath, fps, source="wave", measure="point", bands=4, scale="linear", attack=0.0, release=0.0):
+        """
+        Returns the value of every frame of a source of a track (see WavReader.sourceValues), analyzing it only once.
+        The lock is only held to keep the order of use, analyzing a track only blocks the lookups of that same track
+        """
+        fileKey = self.fileKey(filePath)
+        key = (fileKey, fps, source, measure, bands, scale, attack, release)
+        values = self.features.get(key)
+
+        if values is not None:
+            with self.lock:
+                # Another thread may have evicted it since
+                if key in self.features:
+                    self.features[key] = self.features.pop(key)
+
+            return values
+
+        with self.lock:
+            trackLock = self.trackLocks.setdefault(fileKey, threading.Lock())
+
+        with trackLock:
+            # Another thread may have analyzed it while this one waited
+            values = self.features.get(key)
+
+            if values is None:
+                # Every band comes from the same spectrum, the nodes reading the other bands find them ready
+                sources = [source]
+                if parseSource(source)[0] == "band":
+                    sources += ["band {}".format(band) for band in xrange(1, bands + 1)]
+
+                reader = self.registry.open(filePath, self.cache)
+
+                try:
+                    results = reader.sourceValues(fps, sources, measure, bands, scale, attack, release)
+                finally:
+                    self.registry.release(reader)
+
+                with self.lock:
+                    for name, result in results.items():
+                        # Plain floats are faster to index one at a time than an array
+                        self.features[key[:2] + (name,) + key[3:]] = np.asarray(result, dtype=np.float64).tolist()
+
+                    values = self.features[key]
+
+                    while len(self.features) > self.maxFeatures:
+                        self.features.popitem(last=False)
+
+        return values
+
+    def lookup(self, filePath, frame, fps, source="wave", measure="point", bands=4, scale="linear", attack=0.0, release=0.0, offset=1.0):
+        """
+        Returns the value of a source on a frame of the scene, the track starts on the offset frame.
+        Frames between two frames of the analysis are interpolated, frames outside the track are silent
+        """
+        values = self.values(filePath, fps, source, measure, bands, scale, attack, release)
+        return self.valueAt(values, frame - offset)
+
+    def valueAt(self, values, index):
+        """
+        Returns the value at a fractional index of the values, 0 outside of them
+        """
+        first = int(math.floor(index))
+        fraction = index - first
+
+        before = values[first] if 0 <= first < len(values) else 0.0
+        after = values[first + 1] if 0 <= first + 1 < len(values) else 0.0
+
+        return before + (after - before) * fraction
+
+    def clear(self):
+        """
+        Forgets every analysis kept
+        """
+        with self.lock:
+            self.features.clear()
+            self.fileKeys.clear()
+            self.trackLocks.clear()
+
+# The lookup shared by every audioFeature node
+featureLookup = FeatureLookup()
@@ -0,0 +1,22 @@
+"""
+Imports heavy modules the first time they are used, so loading the tool stays fast
+"""
+import importlib, types
+
+class LazyModule(types.ModuleType):
+    """
+    This class stands for a module until one of its attributes is used, then imports it.
+    After the import every attribute is copied in, so later lookups cost the same as on the module
+    """
+    def __init__(self, name):
+        types.ModuleType.__init__(self, name)
+
+    def __getattr__(self, attribute):
+        # Only called for attributes that are not copied yet
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+
+        return getattr(module, attribute)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
@@ -0,0 +1,201 @@
+"""
+Finds the onsets, tempo and beats of a track and turns them into sparse keys
+"""
+from .compat import xrange
+from .lazy import LazyModule
+
+np = LazyModule("numpy")
+
+# The tangents of each shape as (in, out), the in tangent of a step does not change the curve
+SHAPE_TANGENTS = {"linear": ("linear", "linear"), "smooth": ("flat", "flat"), "step": ("linear", "step")}
+
+def slidingWindows(values, radius):
+    """
+    Returns a view with the 2 * radius + 1 values around every value, repeating the values at the edges
+    """
+    padded = np.pad(values, radius, mode="edge")
+    stride = padded.strides[0]
+
+    return np.lib.stride_tricks.as_strided(padded, shape=(len(values), 2 * radius + 1), strides=(stride, stride), writeable=False)
+
+class OnsetDetector:
+    """
+    This class picks the onsets and the beats of a track from its spectral flux,
+    the amount the spectrum grows from one analysis frame to the next
+    """
+    def __init__(self, flux, frameSeconds, offset=0.0):
+
+        self.flux = np.asarray(flux, dtype=np.float64)      # The spectral flux of every analysis frame
+        self.frameSeconds = frameSeconds                    # The seconds between analysis frames
+        self.offset = offset                                # The second of the track the first frame stands for
+
+        # Pick onsets on the flux relative to its loudest frame, so the sensitivity works for quiet and loud tracks
+        self.normalized = self.flux / max(self.flux.max(), 1e-12) if len(self.flux) else self.flux
+
+    def threshold(self, sensitivity=0.1, seconds=0.25):
+        """
+        Returns the level the flux of every frame has to pass to be an onset,
+        the median of the flux around it plus a margin that is smaller the more sensitive
+        """
+        radius = max(1, int(round(seconds / self.frameSeconds)))
+        return np.median(slidingWindows(self.normalized, radius), axis=1) + (1.0 - sensitivity) * 0.2
+
+    def onsets(self, sensitivity=0.5, minimumGap=0.05):
+        """
+        Returns the seconds and the strength (between 0 and 1) of every onset.
+        Onsets are peaks of the flux above the threshold that are the biggest within minimumGap seconds
+        """
+        if not len(self.normalized):
+            return np.zeros(0), np.zeros(0)
+
+        radius = max(1, int(round(minimumGap / self.frameSeconds)))
+        localMaximum = slidingWindows(self.normalized, radius).max(axis=1)
+
+        isOnset = (self.normalized >= localMaximum) & (self.normalized > self.threshold(sensitivity))
+
+        # Flat peaks are as big as their neighbours, keep only their first frame
+        isOnset[1:] &= self.normalized[1:] != self.normalized[:-1]
+
+        frames = np.flatnonzero(isOnset)
+        strengths = self.normalized[frames]
+
+        return frames * self.frameSeconds + self.offset, strengths / max(strengths.max(), 1e-12) if len(strengths) else strengths
+
+    def tempo(self, minimumBpm=60.0, maximumBpm=200.0):
+        """
+        Returns the beats per minute of the track, the period at which the flux repeats the most.
+        A period is only kept when half of it does not repeat as much, and it is measured again on its multiples
+        """
+        lag = self.beatLag(minimumBpm, maximumBpm)
+        return 60.0 / (lag * self.frameSeconds) if lag else 0.0
+
+    def autocorrelation(self):
+        """
+        Returns the autocorrelation of the flux divided by the frames that overlap at every lag,
+        so long lags are not weaker only because they compare fewer frames
+        """
+        # Through the spectrum so it stays fast on long tracks
+        centered = self.normalized - self.normalized.mean()
+        size = 1 << int(2 * len(centered) - 1).bit_length()
+        spectrum = np.fft.rfft(centered, size)
+        autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum), size)[:len(centered)]
+
+        return autocorrelation / (len(centered) - np.arange(len(centered)))
+
+    def beatLag(self, minimumBpm=60.0, maximumBpm=200.0):
+        """
+        Returns the frames between two beats, with their fraction, or 0 when the track is too short
+        """
+        if len(self.flux) < 2:
+            return 0.0
+
+        autocorrelation = self.autocorrelation()
+
+        # Lags longer than half the track are measured on too few frames
+        shortestLag = max(1, int(60.0 / (maximumBpm * self.frameSeconds)))
+        longestLag = min(len(autocorrelation) // 2, int(np.ceil(60.0 / (minimumBpm * self.frameSeconds))))
+
+        if longestLag <= shortestLag:
+            return 0.0
+
+        lag = shortestLag + int(np.argmax(autocorrelation[shortestLag:longestLag + 1]))
+
+        # A beat that repeats every two periods also repeats every period, the shorter one is the beat
+        while lag // 2 >= shortestLag and self.peakNear(autocorrelation, lag / 2.0)[1] >= 0.8 * autocorrelation[lag]:
+            lag = int(round(self.peakNear(autocorrelation, lag / 2.0)[0]))
+
+        # Every multiple of the period is a peak too, the furthest ones place it with more precision
+        multiples = [(multiple, self.peakNear(autocorrelation, multiple * lag)[0])
+                     for multiple in xrange(1, 9) if multiple * lag + 2 < len(autocorrelation) // 2]
+
+        return sum(multiple * peak for multiple, peak in multiples) / sum(multiple * multiple for multiple, peak in multiples)
+
+    def peakNear(self, autocorrelation, lag, radius=2):
+        """
+        Returns the lag of the biggest autocorrelation within radius frames of a lag, placed between
+        the frames around it, and its value
+        """
+        first = max(1, int(round(lag)) - radius)
+        last = min(len(autocorrelation) - 2, int(round(lag)) + radius)
+
+        if last < first:
+            return lag, 0.0
+
+        peak = first + int(np.argmax(autocorrelation[first:last + 1]))
+        before, value, after = autocorrelation[peak - 1:peak + 2]
+
+        # A single frame is too coarse for the tempo
+        curvature = before - 2 * value + after
+        fraction = 0.5 * (before - after) / curvature if curvature < 0 else 0.0
+
+        return peak + fraction, value
+
+    def beats(self, minimumBpm=60.0, maximumBpm=200.0, tolerance=0.1):
+        """
+        Returns the seconds and the strength of every beat. The first beat is placed where a grid at the tempo
+        of the track meets the most flux, and every beat is moved to the onset within tolerance periods of it,
+        so the beats follow the track instead of drifting away from it
+        """
+        lag = self.beatLag(minimumBpm, maximumBpm)
+        if not lag:
+            return np.zeros(0), np.zeros(0)
+
+        phases = np.arange(int(np.ceil(lag)))
+
+        # Try every offset of the grid at once and keep the one with the most flux on its beats
+        grid = np.arange(0, len(self.normalized) - phases[-1], lag)
+        frames = np.rint(phases[:, None] + grid[None, :]).astype(np.int64).clip(0, len(self.normalized) - 1)
+        position = float(phases[int(np.argmax(self.normalized[frames].sum(axis=1)))])
+
+        threshold = self.threshold()
+        radius = max(1, int(round(tolerance * lag)))
+        beatFrames = []
+
+        while position < len(self.normalized):
+            expected = int(round(position))
+            first = max(0, expected - radius)
+            peak = first + int(np.argmax(self.normalized[first:expected + radius + 1]))
+
+            # Without an onset near it the beat stays on the tempo
+            frame = peak if self.normalized[peak] > threshold[peak] else expected
+            beatFrames.append(frame)
+            position = frame + lag
+
+        beatFrames = np.array(beatFrames, dtype=np.int64).clip(0, len(self.normalized) - 1)
+        strengths = self.normalized[beatFrames]
+
+        return beatFrames * self.frameSeconds + self.offset, strengths / max(strengths.max(), 1e-12)
+
+def eventKeys(times, strengths, attack=2.0, decay=6.0, attackShape="linear", decayShape="linear"):
+    """
+    Returns the times, values and tangents (in, out) of the keys of a curve that rises to every event
+    in attack frames and falls back to zero in decay frames. Times are in frames.
+    Events closer than their attack and decay go straight from one peak to the next, without resting at zero
+    """
+    times = np.asarray(times, dtype=np.float64)
+    strengths = np.asarray(strengths, dtype=np.float64)
+
+    if not len(times):
+        return times, strengths, []
+
+    # Every event has a rest key before it, its peak and a rest key after it
+    keyTimes = np.stack((times - attack, times, times + decay), axis=1)
+    keyValues = np.stack((np.zeros(len(times)), strengths, np.zeros(len(times))), axis=1)
+    keep = np.ones(keyTimes.shape, dtype=bool)
+
+    # The rests between events that overlap are removed, when they touch only one is needed
+    gaps = times[1:] - times[:-1]
+    keep[:-1, 2] = gaps >= attack + decay
+    keep[1:, 0] = gaps > attack + decay
+
+    # A key without attack or decay would be on top of its peak
+    keep[:, 0] &= attack > 0
+    keep[:, 2] &= decay > 0
+
+    attackIn, attackOut = SHAPE_TANGENTS[attackShape]
+    decayIn, decayOut = SHAPE_TANGENTS[decayShape]
+
+    # The attack is shaped by the rest before the peak and the peak, the decay by the peak and the rest after it
+    tangents = np.array([[("linear", attackOut), (attackIn, decayOut), (decayIn, "linear")]] * len(times))
+
+    return keyTimes[keep], keyValues[keep], [tuple(pair) for pair in tangents[keep].tolist()]
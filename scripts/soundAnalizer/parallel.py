@@ -0,0 +1,217 @@
+"""
+Runs the analysis on a pool of processes or on a background thread
+"""
+import os, os.path, sys, threading
+
+from .compat import xrange
+from .lazy import LazyModule
+from .profiling import measured
+from .analysis import WavReader
+
+np = LazyModule("numpy")
+
+def analyzeChunk(filePath, firstFrame, lastFrame, hop, windowSize, window, channel, bands, scale):
+    """
+    Analyzes a range of frames of a file in a worker process,
+    returns the magnitude spectrum or, if bands are given, the band energies
+    """
+    reader = WavReader(filePath)
+    result = np.empty((lastFrame - firstFrame, bands or windowSize // 2 + 1), dtype=np.float32)
+
+    # Work in the same batches as a single process so the memory of a big chunk stays bounded
+    for batchStart in xrange(firstFrame, lastFrame, reader.batchFrames):
+        batchEnd = min(batchStart + reader.batchFrames, lastFrame)
+        spectrum = reader.spectrogramFrames(batchStart, batchEnd, hop, windowSize, window, channel)
+
+        if bands:
+            spectrum = reader.bandEnergies(spectrum, windowSize, bands, scale)
+
+        result[batchStart - firstFrame:batchEnd - firstFrame] = spectrum
+
+    reader.close()
+    return result
+
+class ParallelAnalyzer:
+    """
+    This class splits the spectrogram of many tracks in chunks of frames and analyzes them in a pool of processes.
+    The chunks are put back in frame order, so the result is the same as analyzing on a single process.
+    The processes are spawned and import the main module of the caller again, a script that uses it has to
+    start its work under if __name__ == "__main__": or every process runs the script again
+    """
+    def __init__(self, workers=None, chunkFrames=2048):
+
+        # The process modules are only loaded when a pool is used
+        import multiprocessing
+
+        self.workers = workers or multiprocessing.cpu_count()      # The amount of processes to use
+
+        # The amount of frames analyzed by each task, a multiple of the readers' batches
+        self.chunkFrames = max(1, -(-chunkFrames // WavReader.batchFrames)) * WavReader.batchFrames
+
+        # New processes are started from scratch, forking would copy Maya with all of its threads.
+        # Python 2 cannot choose how processes start, there the chunks run on this process
+        self.context = multiprocessing.get_context("spawn") if hasattr(multiprocessing, "get_context") else None
+
+        # Inside Maya the executable is the application, the spawned processes have to run on mayapy
+        executable = os.path.basename(sys.executable).lower()
+        if executable.startswith("maya") and not executable.startswith("mayapy"):
+            multiprocessing.set_executable(os.path.join(os.path.dirname(sys.executable), "mayapy" + (".exe" if os.name == "nt" else "")))
+
+    @measured("parallel.spectrograms")
+    def spectrograms(self, readers, rate, bands=None, window="rectangular", hop=None, windowSize=None, scale="linear", progress=None):
+        """
+        Returns the spectrogram of every reader, the band energies if bands are given.
+        Magnitude spectrograms are also kept in the readers as if they were computed by them
+        """
+        try:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+        except ImportError:
+            # Without the futures module everything runs on this process, the result is the same
+            ProcessPoolExecutor = None
+
+        if self.context is None:
+            ProcessPoolExecutor = None
+
+        # Split every track in its chunks, a track that was already analyzed does not need any
+        jobs = []
+        results = []
+        computed = []
+
+        for index, reader in enumerate(readers):
+            readerHop, readerWindowSize = reader.analysisSizes(rate, hop, windowSize)
+            frameCount = reader.spectrogramLength(readerHop, readerWindowSize)
+            cached = reader.loadSpectrogram(readerHop, readerWindowSize, window, 0)
+
+            if cached is not None:
+                results.append(reader.bandEnergies(cached, readerWindowSize, bands, scale) if bands else cached)
+                continue
+
+            if not bands and not reader.spectrogramFits(readerHop, readerWindowSize):
+                raise MemoryError("The spectrum of {} is bigger than maxSpectrogramBytes, analyze its bands".format(reader.fileName))
+
+            results.append(np.empty((frameCount, bands or readerWindowSize // 2 + 1), dtype=np.float32))
+            computed.append(index)
+
+            for firstFrame in xrange(0, frameCount, self.chunkFrames):
+                lastFrame = min(firstFrame + self.chunkFrames, frameCount)
+                jobs.append((index, firstFrame, (reader.fileName, firstFrame, lastFrame, readerHop, readerWindowSize, window, 0, bands, scale)))
+
+        if ProcessPoolExecutor is None:
+            for count, (index, firstFrame, arguments) in enumerate(jobs):
+                chunk = analyzeChunk(*arguments)
+                results[index][firstFrame:firstFrame + len(chunk)] = chunk
+
+                if progress:
+                    progress(1.0 * (count + 1) / len(jobs))
+
+        else:
+            executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.context)
+            futures = {}
+
+            try:
+                futures = dict((executor.submit(analyzeChunk, *arguments), (index, firstFrame)) for index, firstFrame, arguments in jobs)
+
+                # Chunks arrive in any order, each one goes to its place in the result
+                for count, future in enumerate(as_completed(futures)):
+                    index, firstFrame = futures[future]
+                    chunk = future.result()
+                    results[index][firstFrame:firstFrame + len(chunk)] = chunk
+
+                    if progress:
+                        progress(1.0 * (count + 1) / len(jobs))
+
+            finally:
+                # A cancelled analysis does not wait for the chunks that are left
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=False)
+
+        # Keep the complete spectrograms in their readers
+        if not bands:
+            for index in computed:
+                readerHop, readerWindowSize = readers[index].analysisSizes(rate, hop, windowSize)
+                readers[index].storeSpectrogram(readerHop, readerWindowSize, window, 0, results[index])
+
+        return results
+
+class AnalysisCancelled(Exception):
+    """
+    Raised inside an analysis that was cancelled
+    """
+
+class AnalysisWorker:
+    """
+    This class runs analysis tasks on a background thread, reporting the progress and the end
+    of the work back on Maya's main thread
+    """
+    def __init__(self, tasks, progressCommand=None, doneCommand=None, deferCommand=None):
+
+        self.tasks = tasks                                  # Functions that receive a progress callback
+        self.progressCommand = progressCommand              # Called with the fraction done on the main thread
+        self.doneCommand = doneCommand                      # Called with the worker on the main thread when it ends
+        self.deferCommand = deferCommand
+
+        # By default the reports go to Maya's main thread
+        if deferCommand is None:
+            from maya import utils
+            self.deferCommand = utils.executeDeferred
+
+        self.cancelEvent = threading.Event()
+        self.error = None
+        self.cancelled = False
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+
+    def start(self):
+        """
+        Starts the work in the background
+        """
+        self.thread.start()
+
+    def run(self):
+        """
+        Runs every task in order, stops at the first error or when cancelled
+        """
+        try:
+            for index, task in enumerate(self.tasks):
+                task(lambda fraction, index=index: self.report((index + fraction) / len(self.tasks)))
+                self.report(1.0 * (index + 1) / len(self.tasks))
+
+        except AnalysisCancelled:
+            self.cancelled = True
+
+        except Exception as error:
+            self.error = error
+
+        if self.doneCommand:
+            self.deferCommand(self.doneCommand, self)
+
+    def report(self, fraction):
+        """
+        Sends the progress to the main thread, this is also where a cancelled task stops
+        """
+        if self.cancelEvent.is_set():
+            raise AnalysisCancelled()
+
+        if self.progressCommand:
+            self.deferCommand(self.progressCommand, fraction)
+
+    def cancel(self):
+        """
+        Asks the tasks to stop at their next progress report
+        """
+        self.cancelEvent.set()
+
+    def isRunning(self):
+        """
+        Returns True while the tasks have not finished
+        """
+        return self.thread.is_alive()
+
+    def wait(self):
+        """
+        Blocks until the tasks finish
+        """
+        if self.isRunning():
+            self.thread.join()
@@ -0,0 +1,206 @@
+"""
+Measures how long every stage of the analysis and baking takes
+"""
+import os, os.path, sys, threading, json, math, time, functools
+
+# The most precise clock available
+timer = getattr(time, "perf_counter", time.time)
+
+class Profiler:
+    """
+    This class measures how long every stage of the analysis and baking takes.
+    While it is disabled the measured functions only pay for a single check
+    """
+    def __init__(self, reportDirectory=None):
+
+        self.enabled = False                # Measure the stages only when asked to
+        self.stages = {}                    # The calls, times and histogram of every stage
+        self.counters = {}                  # Amounts counted while measuring, like the keys written
+        self.lock = threading.Lock()        # The background analysis records from other threads
+
+        # Where the JSON reports and cProfile captures are saved
+        self.reportDirectory = reportDirectory or os.path.join(os.path.expanduser("~"), ".mayaSoundAnalizer", "reports")
+
+    def record(self, stage, seconds):
+        """
+        Adds a call of a stage that took some seconds
+        """
+        # Calls are grouped by powers of two of microseconds
+        bucket = math.frexp(max(seconds * 1e6, 1.0))[1]
+
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = {"calls": 0, "seconds": 0.0, "min": seconds, "max": seconds, "histogram": {}}
+
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["min"] = min(stats["min"], seconds)
+            stats["max"] = max(stats["max"], seconds)
+            stats["histogram"][bucket] = stats["histogram"].get(bucket, 0) + 1
+
+    def count(self, counter, amount=1):
+        """
+        Adds an amount to a counter
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def stage(self, stage):
+        """
+        Returns a context that measures the code inside it as a stage
+        """
+        return StageTimer(self, stage) if self.enabled else NULL_STAGE
+
+    def reset(self):
+        """
+        Forgets everything measured
+        """
+        with self.lock:
+            self.stages = {}
+            self.counters = {}
+
+    def summary(self):
+        """
+        Returns what was measured as a dictionary that can be saved as JSON
+        """
+        with self.lock:
+            stages = {}
+
+            for stage, stats in self.stages.items():
+                stages[stage] = {"calls": stats["calls"], "seconds": stats["seconds"],
+                                 "mean": stats["seconds"] / stats["calls"], "min": stats["min"], "max": stats["max"],
+                                 # Every bucket is named after the microseconds its calls take at most
+                                 "histogram": dict(("<{}us".format(2 ** bucket), calls) for bucket, calls in sorted(stats["histogram"].items()))}
+
+            return {"stages": stages, "counters": dict(self.counters)}
+
+    def formatSummary(self, summary):
+        """
+        Returns a summary as a table, slowest stages first.
+        The time of a stage includes the stages called inside it
+        """
+        lines = ["{:<28} {:>8} {:>10} {:>10} {:>10}".format("stage", "calls", "total s", "mean ms", "max ms")]
+
+        for stage, stats in sorted(summary["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            lines.append("{:<28} {:>8} {:>10.3f} {:>10.3f} {:>10.3f}".format(stage, stats["calls"], stats["seconds"],
+                                                                         stats["mean"] * 1e3, stats["max"] * 1e3))
+
+        for counter, amount in sorted(summary["counters"].items()):
+            lines.append("{:<28} {:>8}".format(counter, amount))
+
+        return "\n".join(lines)
+
+    def report(self, name, saveJson=False):
+        """
+        Prints what was measured since the last report to the Script Editor and starts measuring again.
+        The summary can also be saved as JSON, returns its path
+        """
+        summary = self.summary()
+        summary["name"] = name
+        summary["time"] = time.time()
+        self.reset()
+
+        sys.stdout.write("# {} timing\n{}\n".format(name, self.formatSummary(summary)))
+
+        if not saveJson:
+            return None
+
+        path = self.reportPath(name, ".json")
+        with open(path, "w") as fileObject:
+            json.dump(summary, fileObject, indent=2, sort_keys=True)
+
+        sys.stdout.write("# Timing report saved to {}\n".format(path))
+        return path
+
+    def capture(self, name, function, *args, **kwargs):
+        """
+        Runs a function under cProfile, prints its slowest calls and saves the capture, returns what the function returns
+        """
+        # The profiling modules are only needed for a capture
+        import cProfile, pstats
+
+        try:
+            from StringIO import StringIO
+        except ImportError:
+            # Python 3 Maya versions
+            from io import StringIO
+
+        profile = cProfile.Profile()
+
+        try:
+            return profile.runcall(function, *args, **kwargs)
+
+        finally:
+            path = self.reportPath(name, ".prof")
+            profile.dump_stats(path)
+
+            stream = StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(30)
+            sys.stdout.write("# {} profile, saved to {}\n{}".format(name, path, stream.getvalue()))
+
+    def reportPath(self, name, extension):
+        """
+        Returns a new path in the report directory for a run
+        """
+        if not os.path.isdir(self.reportDirectory):
+            os.makedirs(self.reportDirectory)
+
+        return os.path.join(self.reportDirectory, "{}-{}{}".format(name, time.strftime("%Y%m%d-%H%M%S"), extension))
+
+class StageTimer:
+    """
+    This class measures the code inside a with statement as a stage of a profiler
+    """
+    def __init__(self, profiler, stage):
+
+        self.profiler = profiler
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = timer()
+        return self
+
+    def __exit__(self, *exception):
+        self.profiler.record(self.stage, timer() - self.start)
+        return False
+
+class NullStage:
+    """
+    This class is the stage used while the profiler is disabled, it does nothing
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+NULL_STAGE = NullStage()
+
+# The profiler of the whole tool, it is enabled from the UI
+profiler = Profiler()
+
+def measured(stage):
+    """
+    Decorates a function so every call is measured as a stage while the profiler is enabled
+    """
+    def decorator(function):
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+
+            start = timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.record(stage, timer() - start)
+
+        return wrapper
+
+    return decorator
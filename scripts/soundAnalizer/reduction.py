@@ -0,0 +1,53 @@
+"""
+Removes the keys a curve does not need, keeping it within a tolerance of the original values
+"""
+from .lazy import LazyModule
+from .profiling import measured
+
+np = LazyModule("numpy")
+
+@measured("reduction.reduceKeys")
+def reduceKeys(times, values, tolerance):
+    """
+    Returns the indices of the keys to keep so that the straight lines between them are never further
+    than tolerance from any of the original values (Ramer-Douglas-Peucker measured on the values).
+    Every pass splits all the segments that are off at once, at their worst key
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    if len(times) <= 2 or tolerance <= 0:
+        return np.arange(len(times))
+
+    kept = np.array([0, len(times) - 1])
+    inner = np.arange(1, len(times) - 1)
+
+    while len(inner):
+        # The segment every key that is left belongs to, and the line of that segment
+        segments = np.searchsorted(kept, inner) - 1
+        starts = kept[segments]
+        ends = kept[segments + 1]
+
+        fraction = (times[inner] - times[starts]) / (times[ends] - times[starts])
+        errors = np.abs(values[inner] - (values[starts] + fraction * (values[ends] - values[starts])))
+
+        # The worst error of every segment, the keys of a segment are next to each other
+        firsts = np.flatnonzero(np.r_[True, segments[1:] != segments[:-1]])
+        counts = np.diff(np.r_[firsts, len(inner)])
+        worst = np.maximum.reduceat(errors, firsts)
+
+        splitting = np.repeat(worst > tolerance, counts)
+        if not splitting.any():
+            break
+
+        # Keep the first key with the worst error of every segment that is off
+        isWorst = splitting & (errors == np.repeat(worst, counts))
+        newKeys = inner[isWorst]
+        newKeys = newKeys[np.r_[True, segments[isWorst][1:] != segments[isWorst][:-1]]]
+
+        kept = np.union1d(kept, newKeys)
+
+        # Only the keys of the segments that were split need to be measured again
+        inner = np.setdiff1d(inner[splitting], newKeys, assume_unique=True)
+
+    return kept
@@ -0,0 +1,120 @@
+"""
+Shares a single reader per wav file between every track of the process
+"""
+import os, os.path, threading, collections
+
+from .analysis import WavReader
+
+class ReaderRegistry:
+    """
+    This class keeps one WavReader for every wav file, so applying the same file again shares its mapped file
+    and its analysis. Files are told apart by path, size and modification time, a file that changed gets a new reader.
+    Readers nobody uses are closed once there are more than maxIdleReaders of them, and when the analysis in memory
+    is bigger than maxBytes the least recently used readers are closed or forget their analysis
+    """
+    def __init__(self, maxBytes=512 * 1024**2, maxIdleReaders=4):
+
+        self.maxBytes = maxBytes                            # The bytes of analysis the readers can keep in memory
+        self.maxIdleReaders = maxIdleReaders                # The readers kept open when nobody uses them
+        self.readers = collections.OrderedDict()            # The reader of every file key, the least recently used first
+        self.users = {}                                     # How many tracks use every file key
+        self.lock = threading.Lock()                        # Readers are opened and released from the background analysis too
+
+        self.hits = 0                                       # Opens that got a reader that was already open
+        self.misses = 0                                     # Opens that had to map the file
+        self.closed = 0                                     # Idle readers closed
+        self.released = 0                                   # Readers that had to forget their analysis to fit in maxBytes
+
+    def fileKey(self, filePath):
+        """
+        Returns the key of a file, its real path with its size and modification time
+        """
+        realPath = os.path.normcase(os.path.realpath(filePath))
+        stat = os.stat(realPath)
+
+        return realPath, stat.st_size, stat.st_mtime
+
+    def open(self, filePath, cache=None):
+        """
+        Returns the reader of a file, opening it only if it is not open yet. Every open needs a release
+        """
+        key = self.fileKey(filePath)
+
+        with self.lock:
+            reader = self.readers.pop(key, None)
+
+            if reader is None:
+                self.misses += 1
+                reader = WavReader(filePath, cache)
+            else:
+                self.hits += 1
+
+                # A reader opened without a disk cache starts using it
+                reader.cache = reader.cache or cache
+
+            self.readers[key] = reader
+            self.users[key] = self.users.get(key, 0) + 1
+
+            self.evict()
+
+        return reader
+
+    def release(self, reader):
+        """
+        Tells the registry a track does not use a reader anymore, it stays open until it has to be evicted
+        """
+        with self.lock:
+            for key, openReader in self.readers.items():
+                if openReader is reader:
+                    self.users[key] = max(0, self.users.get(key, 0) - 1)
+                    break
+
+            self.evict()
+
+    def trim(self):
+        """
+        Closes or empties readers until the idle readers and the analysis in memory fit in their limits
+        """
+        with self.lock:
+            self.evict()
+
+    def evict(self):
+        """
+        Closes the least recently used idle readers and then makes the least recently used readers
+        forget their analysis, until everything fits. The lock has to be held
+        """
+        idle = [key for key in self.readers if not self.users.get(key)]
+
+        while idle and (len(idle) > self.maxIdleReaders or self.residentBytes() > self.maxBytes):
+            key = idle.pop(0)
+            self.readers.pop(key).close()
+            self.users.pop(key, None)
+            self.closed += 1
+
+        # The most recently used reader is the track being animated, it keeps its analysis
+        for key in list(self.readers)[:-1]:
+            if self.residentBytes() <= self.maxBytes:
+                break
+
+            if self.readers[key].residentBytes():
+                self.readers[key].releaseBuffers()
+                self.released += 1
+
+    def residentBytes(self):
+        """
+        Returns the bytes of analysis kept in memory by every open reader
+        """
+        return sum(reader.residentBytes() for reader in list(self.readers.values()))
+
+    def stats(self):
+        """
+        Returns how the registry has been used: opens that found their reader (hits) or not (misses),
+        readers open and idle, readers closed or emptied to fit and the bytes of analysis in memory
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "readers": len(self.readers),
+                    "idleReaders": sum(1 for key in self.readers if not self.users.get(key)),
+                    "closed": self.closed, "released": self.released, "residentBytes": self.residentBytes()}
+
+# The registry shared by the whole process
+readerRegistry = ReaderRegistry()
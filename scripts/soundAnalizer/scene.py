@@ -0,0 +1,277 @@
+"""
+Writes and previews the animation curves in the Maya scene.
+maya.cmds is only imported when a writer is created without a commands module
+"""
+from .lazy import LazyModule
+from .profiling import profiler, measured
+
+np = LazyModule("numpy")
+
+class CurveWriter:
+    """
+    This class writes whole animation curves with a single command per curve, without moving the current time
+    """
+    def __init__(self, cmdsModule=None):
+
+        # The commands module to use, a stand-in can be given to record the calls
+        if cmdsModule is None:
+            from maya import cmds as cmdsModule
+
+        self.cmds = cmdsModule
+
+        # The curve node to create depending on the type of the attribute
+        self.curveTypes = {"doubleLinear": "animCurveTL", "doubleAngle": "animCurveTA", "time": "animCurveTT"}
+
+    @measured("curve.write")
+    def writeCurve(self, plug, times, values, name=None, tangents=None):
+        """
+        Replaces the animation of an attribute between the first and the last time with a curve that has a key on every time given,
+        the keys the attribute had before and after them are kept. tangents are the (in, out) tangent types of every key,
+        by default the ones setKeyframe would use
+        """
+        if not len(times):
+            return None
+
+        # Remove the keys that the attribute had, the ones outside the baked range are written again with the new keys
+        with profiler.stage("curve.cutKey"):
+            times, values, tangents = self.mergeKeys(plug, times, values, tangents)
+            self.cmds.cutKey(plug, clear=True)
+
+        # Create a curve that matches the units of the attribute
+        with profiler.stage("curve.createNode"):
+            curveType = self.curveTypes.get(self.cmds.getAttr(plug, type=True), "animCurveTU")
+            curve = self.cmds.createNode(curveType, name=name or self.nodeName(plug), skipSelect=True)
+
+        self.setKeys(curve, times, values)
+        self.setTangents(curve, tangents)
+
+        with profiler.stage("curve.connectAttr"):
+            self.cmds.connectAttr(curve + ".output", plug, force=True)
+
+        profiler.count("curves")
+        profiler.count("keys", len(times))
+
+        return curve
+
+    @measured("curve.update")
+    def updateCurve(self, curve, times, values, tangents=None):
+        """
+        Gives new keys to a curve that already exists between the first and the last time, the node, its connections
+        and its keys outside them are kept. When the amount of keys does not change only the times and values are written
+        and the keys keep their tangents
+        """
+        if not len(times):
+            return
+
+        times, values, tangents = self.mergeKeys(curve, times, values, tangents)
+        keyCount = self.cmds.keyframe(curve, query=True, keyframeCount=True)
+
+        # Remove the keys left over, the ones that are kept are overwritten in order
+        if len(times) < keyCount:
+            with profiler.stage("curve.cutKey"):
+                self.cmds.cutKey(curve, index=(len(times), keyCount - 1), clear=True)
+
+        self.setKeys(curve, times, values)
+
+        if len(times) != keyCount:
+            self.setTangents(curve, tangents)
+
+        profiler.count("curvesUpdated")
+        profiler.count("keys", len(times))
+
+    def mergeKeys(self, plug, times, values, tangents=None):
+        """
+        Returns the times, values and tangents of new keys with the keys an attribute or a curve has before and after them
+        """
+        before, after = self.keysOutside(plug, times[0], times[-1])
+
+        if not (before or after):
+            return times, values, tangents
+
+        keys = before + list(zip(times, values, tangents or [self.defaultTangents()] * len(times))) + after
+
+        return [key[0] for key in keys], [key[1] for key in keys], [key[2] for key in keys]
+
+    def keysOutside(self, plug, start, end):
+        """
+        Returns the keys of an attribute before start and after end, as lists of (time, value, (in, out) tangent types)
+        """
+        keyCount = self.cmds.keyframe(plug, query=True, keyframeCount=True)
+
+        if not keyCount or keyCount == self.cmds.keyframe(plug, query=True, time=(start, end), keyframeCount=True):
+            return [], []
+
+        times = self.cmds.keyframe(plug, query=True, timeChange=True)
+        values = self.cmds.keyframe(plug, query=True, valueChange=True)
+        tangents = zip(self.cmds.keyTangent(plug, query=True, inTangentType=True), self.cmds.keyTangent(plug, query=True, outTangentType=True))
+        keys = list(zip(times, values, tangents))
+
+        return [key for key in keys if key[0] < start], [key for key in keys if key[0] > end]
+
+    def nodeName(self, plug):
+        """
+        Returns a node name made from an attribute, without the path and the namespace separators Maya does not allow in names
+        """
+        return plug.split("|")[-1].replace(".", "_").replace(":", "_")
+
+    def defaultTangents(self):
+        """
+        Returns the (in, out) tangent types that setKeyframe would use
+        """
+        return (self.cmds.keyTangent(query=True, g=True, inTangentType=True)[0],
+                self.cmds.keyTangent(query=True, g=True, outTangentType=True)[0])
+
+    def setKeys(self, curve, times, values):
+        """
+        Sets the time and value of the first keys of a curve with a single command
+        """
+        # Put every time next to its value and set all the keys at once
+        with profiler.stage("curve.setAttr"):
+            keys = np.empty(2 * len(times))
+            keys[0::2] = times
+            keys[1::2] = values
+            self.cmds.setAttr("{}.keyTimeValue[0:{}]".format(curve, len(times) - 1), *keys.tolist())
+
+    def setTangents(self, curve, tangents=None):
+        """
+        Sets the (in, out) tangent types of every key of a curve, by default the ones setKeyframe would use
+        """
+        with profiler.stage("curve.keyTangent"):
+            if tangents:
+                # Set the keys that share their tangents together, as ranges of consecutive keys
+                groups = {}
+                for index, pair in enumerate(tangents):
+                    ranges = groups.setdefault(tuple(pair), [])
+
+                    if ranges and ranges[-1][1] == index - 1:
+                        ranges[-1] = (ranges[-1][0], index)
+                    else:
+                        ranges.append((index, index))
+
+                for (inTangent, outTangent), indices in groups.items():
+                    self.cmds.keyTangent(curve, edit=True, index=indices, inTangentType=inTangent, outTangentType=outTangent)
+
+            else:
+                # Use the same tangents that setKeyframe would use
+                inTangent, outTangent = self.defaultTangents()
+                self.cmds.keyTangent(curve, edit=True, inTangentType=inTangent, outTangentType=outTangent)
+
+    def writeCurves(self, curves):
+        """
+        Writes a dictionary of attributes with their times and values, returns the curve of every attribute
+        """
+        return dict((plug, self.writeCurve(plug, times, values)) for plug, (times, values) in curves.items())
+
+class PreviewDriver:
+    """
+    This class previews the animation with Maya's own playback, driving the attributes
+    with temporary curves that are removed when the playback stops
+    """
+    def __init__(self, curveWriter, cmdsModule=None):
+
+        if cmdsModule is None:
+            from maya import cmds as cmdsModule
+
+        self.cmds = cmdsModule
+        self.curveWriter = curveWriter
+
+        self.curves = []                    # The temporary curves driving the attributes
+        self.originalValues = {}            # The values of the attributes before the preview
+        self.originalSources = {}           # The connections that were driving the attributes before the preview
+        self.playbackState = {}             # The playback options and time before the preview
+        self.scriptJob = None               # The job that cleans up when the playback stops
+        self.stopCommand = None             # Called after the preview is removed
+
+    def isActive(self):
+        """
+        Returns True from the start of a preview until it is stopped
+        """
+        return bool(self.playbackState)
+
+    @measured("preview.start")
+    def start(self, originalValues, times, soundValues, multiplier, stopCommand=None, tangents=None):
+        """
+        Drives every attribute with its sound values and starts the playback
+        """
+        self.stop()
+
+        # The playback is kept before the scene changes, a preview that fails half way is undone with it
+        self.playbackState = {"time": self.cmds.currentTime(query=True),
+                              "loop": self.cmds.playbackOptions(query=True, loop=True),
+                              "playbackSpeed": self.cmds.playbackOptions(query=True, playbackSpeed=True)}
+        self.stopCommand = stopCommand
+
+        try:
+            for plug, originalValue in originalValues.items():
+
+                # Keep what was driving the attribute, the original animation is not touched. The source is the plug
+                # connected to the attribute, a unitConversion node in between is kept
+                sources = self.cmds.listConnections(plug, source=True, destination=False, plugs=True, skipConversionNodes=False)
+                if sources:
+                    self.originalSources[plug] = sources[0]
+                    self.cmds.disconnectAttr(sources[0], plug)
+
+                curve = self.curveWriter.writeCurve(plug, times, soundValues * multiplier + originalValue,
+                                                    name="MusicAnimatorPreview#", tangents=tangents)
+                self.curves.append(curve)
+                self.originalValues[plug] = originalValue
+
+        except Exception:
+            # A locked or non-keyable attribute, the attributes driven so far are put back before the error is shown
+            self.stop()
+            raise
+
+        # Play once from the start in real time so the sound stays in sync
+        self.cmds.playbackOptions(loop="once", playbackSpeed=1.0)
+        self.cmds.currentTime(self.cmds.playbackOptions(query=True, minTime=True))
+
+        # Remove the preview as soon as the playback stops
+        self.scriptJob = self.cmds.scriptJob(conditionFalse=["playingBack", self.onPlaybackStopped], runOnce=True)
+
+        self.cmds.play(forward=True)
+
+    def onPlaybackStopped(self):
+        """
+        Cleans up the preview once Maya stops playing
+        """
+        # The job only runs once, it does not need to be killed
+        self.scriptJob = None
+        self.stop()
+
+    @measured("preview.stop")
+    def stop(self):
+        """
+        Stops the playback, deletes the preview curves and restores the attributes
+        """
+        if not self.isActive():
+            return
+
+        if self.scriptJob is not None and self.cmds.scriptJob(exists=self.scriptJob):
+            self.cmds.scriptJob(kill=self.scriptJob, force=True)
+        self.scriptJob = None
+
+        if self.cmds.play(query=True, state=True):
+            self.cmds.play(state=False)
+
+        self.cmds.delete([curve for curve in self.curves if curve and self.cmds.objExists(curve)])
+
+        # Reconnect the original animation, or put back the original values
+        for plug, source in self.originalSources.items():
+            self.cmds.connectAttr(source, plug, force=True)
+
+        for plug, originalValue in self.originalValues.items():
+            if plug not in self.originalSources:
+                self.cmds.setAttr(plug, originalValue)
+
+        self.cmds.playbackOptions(loop=self.playbackState.get("loop", "continuous"), playbackSpeed=self.playbackState.get("playbackSpeed", 1.0))
+
+        if "time" in self.playbackState:
+            self.cmds.currentTime(self.playbackState["time"])
+
+        self.curves = []
+        self.originalValues = {}
+        self.originalSources = {}
+        self.playbackState = {}
+
+        if self.stopCommand:
+            self.stopCommand()
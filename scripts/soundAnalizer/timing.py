@@ -0,0 +1,100 @@
+"""
+Maps the frames of the scene to the exact positions of their samples in a track
+"""
+from fractions import Fraction
+
+from .lazy import LazyModule
+
+np = LazyModule("numpy")
+
+def exactRate(fps):
+    """
+    Returns a frame rate as an exact fraction. Maya shows the NTSC rates rounded (23.976, 29.97, 59.94...)
+    but they are 1000/1001 of a whole rate, rounding them drifts a sixth of a frame in 90 minutes
+    """
+    rate = Fraction(fps).limit_denominator(1001)
+    ntscRate = Fraction(int(round(fps * 1.001)) * 1000, 1001)
+
+    if rate.denominator != 1 and abs(float(ntscRate) - fps) < 0.0005:
+        return ntscRate
+
+    return rate
+
+def nearestSamples(positions):
+    """
+    Returns the sample where a window starts for every position in the samples of a track: the nearest one,
+    halves going up. Every window of the analysis is placed with it, so a frame starts on the same sample
+    whether it is analyzed with the whole track or on its own
+    """
+    return np.floor(np.asarray(positions, dtype=np.float64) + 0.5).astype(np.int64)
+
+class FrameTiming:
+    """
+    This class places the frames of the scene on the samples of a track the way the audio node plays it:
+    the track starts on the offset frame, skipping sourceStart frames of the file. Positions are computed
+    from the frame numbers every time, never accumulated, so they do not drift however long the timeline is
+    """
+    def __init__(self, sampleRate, fps, offset=1.0, sourceStart=0.0, oversample=1):
+
+        self.sampleRate = sampleRate                                    # The samples per second of the track
+        self.fps = exactRate(fps)                                       # The exact frames per second of the scene
+        self.offset = offset                                            # The frame of the scene where the track starts
+        self.sourceStart = sourceStart                                  # The frames of the file skipped at its start
+        self.oversample = max(1, int(oversample))                       # The values computed for every frame
+        self.samplesPerFrame = Fraction(sampleRate) / self.fps          # The exact samples between two frames
+
+    def frames(self, first, last, sampleCount=None):
+        """
+        Returns the frames between two frames, both included, with oversample values for every frame.
+        With a sampleCount the frames stop when the track is finished
+        """
+        count = int(np.floor((last - first) * self.oversample + 1e-9)) + 1
+        frames = first + np.arange(max(count, 0)) / float(self.oversample)
+
+        if sampleCount is not None:
+            frames = frames[:int(np.searchsorted(self.samplePositions(frames), sampleCount))]
+
+        return frames
+
+    def samplePositions(self, frames):
+        """
+        Returns the position of every frame in the samples of the track, with its fraction of a sample
+        """
+        return (np.asarray(frames, dtype=np.float64) - self.offset + self.sourceStart) * float(self.samplesPerFrame)
+
+    def sampleStarts(self, frames):
+        """
+        Returns the sample where the window of every frame starts
+        """
+        return nearestSamples(self.samplePositions(frames))
+
+    def framesAt(self, seconds):
+        """
+        Returns the frame of the scene where every second of the track plays
+        """
+        return np.asarray(seconds, dtype=np.float64) * float(self.fps) + self.offset - self.sourceStart
+
+    def valuesPerSecond(self):
+        """
+        Returns how many values are computed for every second of the scene
+        """
+        return float(self.fps) * self.oversample
+
+    def wholeFrames(self, frames):
+        """
+        Returns the index of every frame in the analysis of the whole track, where frame n starts
+        n * samplesPerFrame samples into the file, or None when some frame falls between them
+        """
+        indices = np.asarray(frames, dtype=np.float64) - self.offset + self.sourceStart
+        rounded = np.rint(indices)
+
+        if not np.array_equal(indices, rounded):
+            return None
+
+        return rounded.astype(np.int64)
+
+    def params(self):
+        """
+        Returns what makes this timing unique, to cache the values computed with it
+        """
+        return {"fps": str(self.fps), "offset": self.offset, "sourceStart": self.sourceStart, "oversample": self.oversample}
@@ -0,0 +1,1131 @@
+"""
+The Music Animator window, it is built by show()
+"""
+from maya import cmds, mel, OpenMayaUI
+import os, os.path, sys
+
+from .compat import xrange
+from .lazy import LazyModule
+from .profiling import profiler, measured
+from .cache import AnalysisCache
+from .registry import readerRegistry
+from .timing import FrameTiming
+from .parallel import ParallelAnalyzer, AnalysisWorker
+from .scene import CurveWriter, PreviewDriver
+from .onsets import eventKeys
+from .reduction import reduceKeys
+from .features import MODES, MEASURES, SCALES
+
+np = LazyModule("numpy")
+
+class MainUI():
+    """
+    This class manages the UI creation and its functionality
+    """
+    
+    def __init__(self):
+        self.readersList = []                                           # List of the wav reader objects created     
+        self.reader = None                                              # The current wav reader being used
+        self.audioNode = ""                                             # The audio node in the Maya scene
+        self.playBackSlider = mel.eval('$tmpVar=$gPlayBackSlider')      # Maya's playback slider (to add sound on it)
+        self.valueMultiplier = 1                                        # The multiplier being applied to the wave values
+        self.keyTolerance = 0.0                                         # How far the reduced curves can be from every frame, 0 keys every frame
+        self.subFrames = 1                                              # The keys baked on every frame, more than one for motion blur
+        self.soundFeatures = (None, {})                                 # The frames and the values by source of the last analysis
+        self.bakedCurves = {}                                           # The curve and original value of every attribute of the last bake
+        self.bakedFeatures = (None, {})                                 # The frames and the values by source the last bake used
+        self.bakedMethod = ""                                           # The analyzing method of the last bake
+        self.updateBakedCurves = True                                   # Change the last bake when the multiplier or the band change
+        self.mappings = []                                              # The attributes of the mapping table with their source and multiplier
+        self.mappingList = ""                                           # Shows the mapping table
+        self.sourceMenu = ""                                            # The bands and channels that can drive the mapped attributes
+        self.analyzerMethod = "WaveForm"                                # The method to analyze the wav file
+        self.bandAmount = 4                                             # The amount of bands to divide the frequencies on spectrum mode
+        self.selectedBand = 1                                           # The selected band to animate the object
+        self.bandScale = "linear"                                       # How the frequencies are spread among the bands
+        self.envelopeMode = "point"                                     # How the waveform is measured on every frame
+        self.envelopeAttack = 0.0                                       # Seconds the waveform envelope takes to rise
+        self.envelopeRelease = 0.0                                      # Seconds the waveform envelope takes to fall
+        self.eventType = "onsets"                                       # Key the onsets or the beats of the music
+        self.eventSensitivity = 0.5                                     # How easily a sound counts as an onset
+        self.eventAttack = 2.0                                          # Frames every event key takes to rise
+        self.eventDecay = 6.0                                           # Frames every event key takes to fall
+        self.attackShape = "linear"                                     # How every event key rises
+        self.decayShape = "linear"                                      # How every event key falls
+        self.analysisCache = AnalysisCache()                            # The results of the analysis kept between sessions
+        self.curveWriter = CurveWriter()                                # Writes the animation curves of the attributes
+        self.previewDriver = PreviewDriver(self.curveWriter)            # Plays the animation without keying the attributes
+        self.previewButton = ""                                         # The button that starts and stops the preview
+        self.analysisWorkers = {}                                       # The background analysis of every reader
+        self.progressBar = ""                                           # Shows the progress of the background analysis
+        self.parallelAnalysis = False                                   # Analyze with a pool of processes instead of a single thread
+        self.saveTimingReports = False                                  # Save the timing of every bake and preview as JSON
+        self.profileNextRun = False                                     # Capture the next bake or preview with cProfile
+        self.profileCheckBox = ""                                       # The option to capture the next run with cProfile
+        
+        self.graph = ""                                                 # The UI component representing the graphs
+        self.spectrumCurve = ""                                         # The curve showing the spectrum of the current frame
+        self.spectrumFrames = (None, None, None)                        # The analysis it shows, the hop of its frames and their bands
+        self.mainLayout = ""                                            # The layout that will keep the graphs
+        self.spectrumLayout = ""                                        # UI elements to modify how to analyze with spectrum methos
+        self.waveFormLayout = ""                                        # UI elements to modify how to analyze with the waveform method
+        self.beatsLayout = ""                                           # UI elements to modify how the onsets and beats are keyed
+
+        # Create the window
+        self.MakeWin()
+
+    def MakeWin(self):
+        """
+        Builds and shows the window
+        """
+        windowName = "mainUI"
+        
+        if cmds.window(windowName, query=True, exists=True):
+            cmds.deleteUI(windowName)
+        
+        # Creating window
+        self.window = cmds.window(windowName, title="Music Animator", width=510)
+        
+        
+        # Creatin main layout that will contain everything
+        cmds.columnLayout(columnOffset=("both", 5))
+        
+        allowedAreas = ['right', 'left']
+        if cmds.dockControl("MusicAnimator", query=True, exists=True):
+            cmds.deleteUI("MusicAnimator")
+            
+        cmds.dockControl("MusicAnimator", area='right', content=windowName, allowedArea=allowedAreas )
+
+        # Space for the user to select the wav file
+        cmds.separator(height=10, style="none")
+        fileNameField = cmds.textFieldButtonGrp(label="Select wav file", buttonLabel="...", buttonCommand=lambda: self.OpenFile(fileNameField))
+        
+        # Button for Applying the audio (this creates an audio node)
+        # and adds it to the timeline
+        cmds.separator(height=5, style="none")
+        cmds.rowLayout(numberOfColumns=3, adjustableColumn=1)
+        self.progressBar = cmds.progressBar(width=330, maxValue=100, annotation="Analysis of the selected track")
+        cmds.button(label="Cancel", width = 80, annotation="Stop analyzing the selected track", command=self.CancelAnalysis)
+        cmds.button(label="Apply audio", width = 80, command=lambda x: self.ApplyAudio(fileNameField, tracksMenu))
+        cmds.setParent("..")
+        
+        # Track chooser (in case more than one audio is created)
+        cmds.separator(height=10, style="none")
+        tracksMenu = cmds.optionMenu(label="Select audio track: ", width=500, changeCommand=lambda x: self.ChangeTrack(tracksMenu, x))
+        
+        # Creating spaces for adding objects and attributes
+        cmds.separator(height=10, style="none")
+        cmds.rowColumnLayout(numberOfColumns=5, columnWidth=[(1,100),(2,150),(3,10),(4,100),(5,150)])
+        cmds.button(label="Add Object(s)", command=lambda x: self.AddObj(OBJSelect))
+        OBJSelect=cmds.textScrollList(allowMultiSelection=True, selectCommand= lambda: self.selectObjectsOnScene(OBJSelect))
+        cmds.separator(width=10, style="none")
+        cmds.button(label="Add Attributes", command=lambda x: self.AddAttr(OBJSelect, AttrSelect))
+        AttrSelect=cmds.textScrollList(allowMultiSelection=True)
+        cmds.setParent("..")
+
+        # Button for resetting the scrollList
+        cmds.separator(height=5, style="none")
+        cmds.button(label="Reset Lists", width=100, command= lambda x: self.ResetScrollLists(OBJSelect, AttrSelect))
+        cmds.separator(height=10, style="none")
+
+        # Create option for audio methods
+        cmds.separator(height=5, style="none")
+        cmds.optionMenu(label="Select analyzing method: ", width=500, changeCommand=lambda x: self.ChangeAnalizer(x))
+        cmds.menuItem(label="WaveForm", annotation="Use the entire shape of the wave for animation")
+        cmds.menuItem(label="Spectrum", annotation="Use the state of the frequencies on each frame")
+        cmds.menuItem(label="Beats", annotation="Key only around the onsets or the beats of the music")
+
+        # Create WaveForm options
+        self.waveFormLayout = cmds.columnLayout()
+        cmds.separator(height=5, style="none")
+        cmds.optionMenu(label="Wave measure: ", changeCommand=lambda x: self.ChangeEnvelopeMode(x))
+        cmds.menuItem(label="Point", annotation="Use one sample on each frame")
+        cmds.menuItem(label="RMS", annotation="Use the loudness of all the samples of each frame")
+        cmds.menuItem(label="Mean", annotation="Use the mean absolute value of the samples of each frame")
+        cmds.menuItem(label="Peak", annotation="Use the loudest sample of each frame")
+        cmds.separator(height=5, style="none")
+        envelopeTimes = cmds.floatFieldGrp(numberOfFields=2, label="Attack / Release (s)", value1=0.0, value2=0.0,
+                                           annotation="Seconds the envelope takes to rise and to fall",
+                                           changeCommand=lambda *args: self.ChangeEnvelopeTimes(envelopeTimes))
+        cmds.setParent("..")
+
+        # Create Spectrum options
+        self.spectrumLayout = cmds.columnLayout()
+        cmds.separator(height=5, style="none")
+        cmds.intSliderGrp(label="Band Amount", value=3, minValue=4, maxValue=20, field=True,
+                        annotation = "The amount of divisions in the frequencies",
+                        statusBarMessage = "The amount of divisions in the frequencies", 
+                        changeCommand=  lambda x: self.ChangeBandAmount(x, BandSelector))
+        cmds.separator(height=5, style="none")
+        BandSelector = cmds.intSliderGrp(label="Selected Band", value=3, minValue=1, maxValue=4, field=True, 
+                        annotation="The specific division to use",
+                        statusBarMessage="The specific division to use",
+                        changeCommand=  lambda x: self.ChangeSelectedBand(x))
+        cmds.separator(height=5, style="none")
+        cmds.optionMenu(label="Band scale: ", changeCommand=lambda x: self.ChangeBandScale(x))
+        cmds.menuItem(label="Linear", annotation="Every band covers the same range of frequencies")
+        cmds.menuItem(label="Logarithmic", annotation="Every band covers the same amount of octaves")
+        cmds.menuItem(label="Mel", annotation="Bands follow how the pitch is perceived")
+        cmds.layout(self.spectrumLayout, edit=True, enable=False)
+        cmds.setParent("..")
+
+        # Create Beats options
+        self.beatsLayout = cmds.columnLayout()
+        cmds.separator(height=5, style="none")
+        cmds.optionMenu(label="Events: ", changeCommand=lambda x: self.ChangeEventType(x))
+        cmds.menuItem(label="Onsets", annotation="Every note or hit that starts")
+        cmds.menuItem(label="Beats", annotation="A steady grid at the tempo of the music")
+        cmds.separator(height=5, style="none")
+        cmds.floatSliderGrp(label="Sensitivity", minValue=0.0, maxValue=1.0, value=self.eventSensitivity, field=True,
+                            annotation="How easily a sound counts as an onset",
+                            changeCommand=lambda x: self.ChangeEventSensitivity(x))
+        cmds.separator(height=5, style="none")
+        eventTimes = cmds.floatFieldGrp(numberOfFields=2, label="Attack / Decay (frames)", value1=self.eventAttack,
+                                        value2=self.eventDecay, annotation="Frames every key takes to rise and to fall",
+                                        changeCommand=lambda *args: self.ChangeEventTimes(eventTimes))
+        cmds.separator(height=5, style="none")
+        for stage in ("Attack", "Decay"):
+            cmds.optionMenu(label="{} shape: ".format(stage), changeCommand=lambda x, stage=stage: self.ChangeEventShape(stage, x))
+            cmds.menuItem(label="Linear")
+            cmds.menuItem(label="Smooth")
+            cmds.menuItem(label="Step")
+        cmds.layout(self.beatsLayout, edit=True, enable=False)
+        cmds.setParent("..")
+        
+        # Creating multiplier for values
+        cmds.separator(height=5, style="none")
+        cmds.intSliderGrp(label="Value Multiplier", min=1, max=100, value=1,field=True, changeCommand= self.setMultiplier)
+        cmds.floatSliderGrp(label="Key Tolerance", minValue=0.0, maxValue=1.0, fieldMaxValue=1000.0, value=self.keyTolerance,
+                            field=True, precision=3, changeCommand=self.setKeyTolerance,
+                            annotation="Remove the keys the curves do not need to stay this close to every frame, 0 keeps them all")
+        cmds.intSliderGrp(label="Keys per Frame", min=1, max=8, value=self.subFrames, field=True, changeCommand=self.setSubFrames,
+                          annotation="Key between the frames too, for motion blur that follows the music")
+        cmds.checkBox(label="Update the last animation when the multiplier or the band change", value=self.updateBakedCurves,
+                      changeCommand=self.SetUpdateBakedCurves)
+
+        # Creating buttons for preview or animation
+        cmds.separator(height=5, style="none")
+        cmds.rowLayout(numberOfColumns=3, columnWidth=[(1,250),(2,10),(3,250)])
+        self.previewButton = cmds.button(label="Preview", width=250, command=lambda x: self.PreviewAnim(OBJSelect, AttrSelect))
+        cmds.separator(width=10, style="none")
+        cmds.button(label="Animate", width=250, command=lambda x: self.SetKeys(OBJSelect, AttrSelect))
+        cmds.setParent("..")
+        cmds.button(label="Drive with Audio Nodes", width=510, command=lambda x: self.ConnectFeatureNodes(OBJSelect, AttrSelect),
+                    annotation="Connect audioFeature nodes instead of keying, they look up the analysis on every frame")
+
+        # Mapping table, many attributes driven by different bands or channels with a single analysis
+        cmds.separator(height=5, style="none")
+        cmds.frameLayout(label="Mapping table", labelIndent=1, width=510, collapsable=True, collapse=True, marginHeight=5)
+        cmds.text(label="Drive every attribute from its own band or channel, the track is analyzed once.")
+        cmds.rowLayout(numberOfColumns=3, columnWidth=[(1,230),(2,130),(3,130)])
+        self.sourceMenu = cmds.optionMenu(label="Source: ", width=220)
+        cmds.button(label="Add Mappings", width=125, annotation="Map the selected attributes of the selected objects to the source",
+                    command=lambda x: self.AddMappings(OBJSelect, AttrSelect))
+        cmds.button(label="Spread Bands", width=125, annotation="Map every selected object to the next band, like an equalizer",
+                    command=lambda x: self.SpreadBands(OBJSelect, AttrSelect))
+        cmds.setParent("..")
+        self.mappingList = cmds.textScrollList(allowMultiSelection=True, height=120, width=500)
+        cmds.rowLayout(numberOfColumns=3, columnWidth=[(1,165),(2,165),(3,165)])
+        cmds.button(label="Remove Selected", width=160, command=self.RemoveMappings)
+        cmds.button(label="Clear Table", width=160, command=self.ClearMappings)
+        cmds.button(label="Animate Table", width=160, command=self.SetMappedKeys)
+        cmds.setParent("..")
+        cmds.setParent("..")
+        self.UpdateSourceMenu()
+        
+        # Separation for experiments
+        cmds.separator(height=5, style="none")
+        self.mainLayout = cmds.frameLayout(label="Analizing functions", labelIndent=1, width=510, collapsable=True, collapse=True,marginHeight=5)
+        cmds.text(label="Draw the shape of the wave:")
+        cmds.button(label="Draw Waveform", command= self.drawGraph)
+
+        cmds.separator(height=5, style="none")
+        cmds.text(label="Draw the spectrum of the frequencies on the current frame, it follows the time slider.")
+        cmds.text(label="Change the analyzing method above to modify the number of divisions.")
+        cmds.button(label="Draw Spectrum", command= self.drawSpectrum)
+
+        cmds.separator(height=5, style="none")
+        cmds.checkBox(label="Analyze new tracks using all the processor cores", value=self.parallelAnalysis,
+                      changeCommand=self.SetParallelAnalysis)
+
+        cmds.separator(height=5, style="none")
+        cmds.text(label="Delete the analysis saved from earlier sessions.")
+        cmds.button(label="Clear Analysis Cache", command= self.ClearCache)
+
+        cmds.separator(height=5, style="none")
+        cmds.text(label="Print how long every stage of a bake or preview takes to the Script Editor.")
+        cmds.checkBox(label="Measure the time of every stage", value=profiler.enabled, changeCommand=self.SetInstrumentation)
+        cmds.checkBox(label="Save the timing reports as JSON", value=self.saveTimingReports, changeCommand=self.SetTimingReports)
+        self.profileCheckBox = cmds.checkBox(label="Profile the next bake or preview with cProfile", value=self.profileNextRun,
+                                             changeCommand=self.SetProfileNextRun)
+        
+        #cmds.showWindow(windowName)
+        
+
+    def selectObjectsOnScene(self, ObjScroll, *args):
+        """
+        This function selects the objects in the scene that the user pick on the scrollList
+        """
+        currentItems = cmds.textScrollList(ObjScroll, query=True, selectUniqueTagItem=True)
+
+        cmds.select(currentItems, replace=True)
+
+    def ResetScrollLists(self, ObjScroll, AttrScroll, *args):
+        """
+        Resets the lists of objects and attributes
+        """
+        cmds.textScrollList(ObjScroll, edit=True, removeAll=True)
+        cmds.textScrollList(AttrScroll, edit=True, removeAll=True)
+
+    def ChangeAnalizer(self, method):
+        """
+        Change how to analyze the wav file
+        """
+
+        self.analyzerMethod = method
+
+        # Enable only the options of the selected method
+        cmds.layout(self.spectrumLayout, edit=True, enable=method == "Spectrum")
+        cmds.layout(self.waveFormLayout, edit=True, enable=method == "WaveForm")
+        cmds.layout(self.beatsLayout, edit=True, enable=method == "Beats")
+
+    def ChangeEnvelopeMode(self, mode, *args):
+        """
+        Updates how the waveform is measured on every frame
+        """
+        self.envelopeMode = mode.lower()
+
+    def ChangeEnvelopeTimes(self, timesField, *args):
+        """
+        Updates the attack and release of the waveform envelope
+        """
+        self.envelopeAttack = max(0.0, cmds.floatFieldGrp(timesField, query=True, value1=True))
+        self.envelopeRelease = max(0.0, cmds.floatFieldGrp(timesField, query=True, value2=True))
+
+    def ChangeBandAmount(self, amount, BandSelector, *args):
+        """
+        Updates the amount of bands to analyze with spectrum mode
+        """
+
+        self.bandAmount = amount
+
+        # Get the current value of selected band
+        currentValue = cmds.intSliderGrp(BandSelector, query=True, value=True)
+
+        # If the selected band is greater than the total amount of bands, 
+        # change that value to the new maximum
+        if currentValue > amount:
+            cmds.intSliderGrp(BandSelector, edit=True, value=amount)
+
+        # Modify band selector to reflect the new MaxValue
+        cmds.intSliderGrp(BandSelector, edit=True, maxValue=amount)
+
+        self.UpdateSourceMenu()
+
+    def ChangeSelectedBand(self, band, *args):
+        """
+        Updates the selected band used to animate objects
+        """
+        self.selectedBand = band
+        self.UpdateBakedCurves()
+
+    def ChangeBandScale(self, scale, *args):
+        """
+        Updates how the frequencies are divided among the bands
+        """
+        self.bandScale = {"Linear": "linear", "Logarithmic": "log", "Mel": "mel"}[scale]
+        
+    def ChangeEventType(self, eventType, *args):
+        """
+        Chooses between keying the onsets or the beats of the music
+        """
+        self.eventType = eventType.lower()
+
+    def ChangeEventSensitivity(self, sensitivity, *args):
+        """
+        Updates how easily a sound counts as an onset
+        """
+        self.eventSensitivity = sensitivity
+
+    def ChangeEventTimes(self, timesField, *args):
+        """
+        Updates the frames every event key takes to rise and to fall
+        """
+        self.eventAttack = max(0.0, cmds.floatFieldGrp(timesField, query=True, value1=True))
+        self.eventDecay = max(0.0, cmds.floatFieldGrp(timesField, query=True, value2=True))
+
+    def ChangeEventShape(self, stage, shape, *args):
+        """
+        Updates how the event keys rise (Attack) or fall (Decay)
+        """
+        if stage == "Attack":
+            self.attackShape = shape.lower()
+        else:
+            self.decayShape = shape.lower()
+
+    def OpenFile(self, theTextField, *args):
+        """
+        Opens a dialog to let the user select a wav file on their computer
+        """
+        
+        waveFile = cmds.fileDialog2(caption="Select wav file", fileFilter="*.wav", fileMode=1)
+        
+        cmds.textFieldButtonGrp(theTextField, edit=True, text=waveFile[0])
+        
+    def ApplyAudio(self, fileNameField, tracksMenu, *args):
+        """
+        Applies the selected audio to the timeline and creates a wav reader
+        """
+        # Get path from text field
+        audioPath = cmds.textFieldButtonGrp(fileNameField, query=True, text=True)
+        
+        # Get the reader of the file, a file that was already applied shares its reader and its analysis
+        newReader = readerRegistry.open(audioPath, self.analysisCache)
+        
+        # Get base name from the path and remove the 
+        songName = os.path.basename(audioPath).split('.')[0]
+        
+        # Create audio node with the song name
+        audioNode = cmds.createNode("audio", name=songName)
+
+        # Add the song to the optionMenu
+        cmds.setParent(tracksMenu, menu=True)
+        cmds.menuItem(label=audioNode)
+        numberOfItems = cmds.optionMenu(tracksMenu, query=True, numberOfItems=True)
+        cmds.optionMenu(tracksMenu, edit=True, select=numberOfItems)
+        
+        # Append reader to the reader list and make it the selected reader
+        self.readersList.append(newReader)
+        self.reader = self.readersList[-1]
+        self.UpdateSourceMenu()
+        
+        # Put file name on audio node, the track starts on frame 1 like the keys
+        cmds.setAttr("{}.filename".format(audioNode), audioPath, type="string")
+        cmds.setAttr("{}.offset".format(audioNode), 1)
+        self.audioNode = audioNode
+        
+        # Put music on playBackSlider
+        cmds.timeControl(self.playBackSlider, edit=True, sound=audioNode, displaySound=True)
+
+        # Start analyzing with the fps of the scene while the user sets up the animation
+        if newReader not in self.analysisWorkers:
+            self.StartAnalysis(newReader, mel.eval('currentTimeUnitToFPS()'))
+
+    def StartAnalysis(self, reader, frameRate):
+        """
+        Analyzes a reader on a background thread, the results stay in the reader for later use
+        """
+        tasks = [lambda progress: reader.sampleStepped(frameRate),
+                 lambda progress: reader.peakPyramid()]
+
+        if not reader.spectrogramFits(*reader.analysisSizes(frameRate)):
+            # The spectrum of a long track does not fit in memory, only its bands are kept, on the disk cache
+            tasks.append(lambda progress: reader.spectrogram(frameRate, self.bandAmount, scale=self.bandScale, progress=progress))
+        elif self.parallelAnalysis:
+            tasks.append(lambda progress: ParallelAnalyzer().spectrograms([reader], frameRate, progress=progress))
+        else:
+            tasks.append(lambda progress: reader.magnitudeSpectrogram(frameRate, progress=progress))
+
+        worker = AnalysisWorker(tasks, progressCommand=lambda fraction: self.UpdateProgress(reader, fraction),
+                                doneCommand=self.AnalysisDone)
+        self.analysisWorkers[reader] = worker
+        worker.start()
+
+    def UpdateProgress(self, reader, fraction):
+        """
+        Shows the progress of the background analysis of the selected track
+        """
+        if reader is self.reader:
+            cmds.progressBar(self.progressBar, edit=True, progress=int(fraction * 100))
+
+    def AnalysisDone(self, worker):
+        """
+        Called on the main thread when a background analysis ends
+        """
+        if worker.error:
+            cmds.warning("The analysis failed: {}".format(worker.error))
+
+        if (worker.error or worker.cancelled) and worker is self.analysisWorkers.get(self.reader):
+            cmds.progressBar(self.progressBar, edit=True, progress=0)
+
+        # The spectrum drawn flat while the analysis ran shows the current frame now
+        if worker is self.analysisWorkers.get(self.reader) and self.spectrumCurve and cmds.falloffCurve(self.spectrumCurve, exists=True):
+            self.UpdateSpectrum()
+
+        # The new analysis may not fit in the memory of the readers
+        readerRegistry.trim()
+
+    def CancelAnalysis(self, *args):
+        """
+        Stops the background analysis of the selected track
+        """
+        worker = self.analysisWorkers.get(self.reader)
+
+        if worker and worker.isRunning():
+            worker.cancel()
+
+    def ReleaseReaders(self):
+        """
+        Stops the analysis of every track and gives their readers back to the registry
+        """
+        for worker in self.analysisWorkers.values():
+            if worker.isRunning():
+                worker.cancel()
+                worker.wait()
+
+        for reader in self.readersList:
+            readerRegistry.release(reader)
+
+        self.analysisWorkers = {}
+        self.readersList = []
+        self.reader = None
+
+    def WaitForAnalysis(self):
+        """
+        Waits for the background analysis of the selected track, only if it has not finished yet
+        """
+        worker = self.analysisWorkers.get(self.reader)
+
+        if worker:
+            worker.wait()
+        
+    def ChangeTrack(self, tracksMenu, selectedTrack):
+        """
+        Changes from one audio node to another
+        """
+        # Set selected track as the audio in the playBackSlider
+        cmds.timeControl(self.playBackSlider, edit=True, sound=selectedTrack, displaySound=True)
+        self.audioNode = selectedTrack
+        
+        # Get the index of this track
+        numberOfItems = cmds.optionMenu(tracksMenu, query=True, select=True)
+
+        # Set the wav reader
+        self.reader = self.readersList[numberOfItems-1]
+        self.UpdateSourceMenu()
+
+        # Show the progress of this track, a running analysis updates it by itself
+        worker = self.analysisWorkers.get(self.reader)
+        finished = worker and not worker.isRunning() and not (worker.cancelled or worker.error)
+        cmds.progressBar(self.progressBar, edit=True, progress=100 if finished else 0)
+        
+    def AddObj(self, scrollList, *args):
+        """
+        Adds an object to the textScrollList
+        """
+        # Get list of selected onbjects
+        selectedObjects = cmds.ls(selection=True, objectsOnly=True)
+
+        if not selectedObjects:
+            cmds.warning("Please select an object in the scene")
+            return
+        
+        # Get current items  on the scroll list
+        currentItems = cmds.textScrollList(scrollList, query=True, allItems=True)
+        
+        itemsToAdd = selectedObjects
+        
+        # If there are items selected on the scroll, only add those that were not previously added
+        if currentItems:
+            itemsToAdd = [item for item in selectedObjects if not item in currentItems]
+        
+        cmds.textScrollList(scrollList, edit=True, append=itemsToAdd, uniqueTag=itemsToAdd)
+        
+    def AddAttr(self, ObjScroll, scrollList, *args):
+        """
+        Add attributes from the objects
+        """
+        selectedObjects = cmds.textScrollList(ObjScroll, query=True, selectUniqueTagItem=True)
+
+        if not selectedObjects:
+            cmds.warning("Please add select an object from the Object Scroll List")
+            return
+        
+        # Restart the attr scrollList
+        cmds.textScrollList(scrollList, edit=True, removeAll=True)
+        
+        # Get the attrs in the first object
+        attrList = cmds.listAttr(selectedObjects[0], keyable=True, scalar=True)
+        resultList = []
+
+        # Avoid inserting the visibility attribute
+        if "visibility" in attrList:
+            attrList.remove("visibility")
+        
+        # Loop trrough the rest of objects
+        for obj in selectedObjects:
+            
+            objectAttrs = cmds.listAttr(obj, keyable=True, scalar=True)
+
+            # Add only those attributes that are in both list, this makes that only shared attributes are shown
+            attrList = [attr for attr in objectAttrs if attr in attrList]
+        
+        # Append to scroll list
+        cmds.textScrollList(scrollList, edit=True, append=attrList, uniqueTag=attrList)
+        
+    def PreviewAnim(self, ObjScroll, AttrScroll, *args):
+        """
+        This function shows the user how the animation will look, clicking again stops the preview
+        """
+        if self.previewDriver.isActive():
+            self.previewDriver.stop()
+            return
+
+        if not self.reader:
+            cmds.warning("Please apply an audio first")
+            return
+
+        # Get lists of objects and attrs
+        objList = cmds.textScrollList(ObjScroll, query=True, selectUniqueTagItem=True)
+        attrList = cmds.textScrollList(AttrScroll, query=True, selectUniqueTagItem=True)
+
+        if not objList:
+            cmds.warning("Please select at least one object in the Object scroll list")
+            return
+
+        if not attrList:
+            cmds.warning("Please select at least one attribute in the Attribute scroll list")
+            return
+
+        endFrame = int(cmds.playbackOptions(query=True, maxTime=True))      # The final frame on the timeslider
+        frameRate = mel.eval('currentTimeUnitToFPS()')                      # The fps of the scene
+
+        def preview():
+            # Analyze the values of every frame
+            times, soundValues, tangents = self.GetSoundKeys(frameRate, endFrame)
+
+            # Dictionary containing the original values of the attributes
+            originalAttributes = self.GetOriginalValues(objList, attrList)
+
+            # Maya plays temporary curves, they are removed and the values restored when the playback stops
+            cmds.button(self.previewButton, edit=True, label="Stop Preview")
+            self.previewDriver.start(originalAttributes, times, soundValues, self.valueMultiplier,
+                                     stopCommand=lambda: cmds.button(self.previewButton, edit=True, label="Preview"),
+                                     tangents=tangents)
+
+        self.MeasureRun("preview", preview)
+
+    def SetKeys(self, ObjScroll, AttrScroll, *args):
+        """
+        This function applies the animation from the music
+        """
+        if not self.reader:
+            cmds.warning("Please apply an audio first")
+            return
+
+        objList = cmds.textScrollList(ObjScroll, query=True, selectUniqueTagItem=True)
+        attrList = cmds.textScrollList(AttrScroll, query=True, selectUniqueTagItem=True)
+
+        if not objList:
+            cmds.warning("Please select at least one object in the Object scroll list")
+            return
+
+        if not attrList:
+            cmds.warning("Please select at least one attribute in the Attribute scroll list")
+            return
+
+        # A preview still playing would be baked as the original values, it restores them first
+        self.previewDriver.stop()
+
+        endFrame = int(cmds.playbackOptions(query=True, maxTime=True))
+        frameRate = mel.eval('currentTimeUnitToFPS()')
+
+        def bake():
+            # Analyze the values of every frame only once for all the attributes
+            times, soundValues, tangents = self.GetSoundKeys(frameRate, endFrame)
+
+            # Dictionary containing the original values of the attributes
+            originalAttributes = self.GetOriginalValues(objList, attrList)
+
+            # Write the whole curve of every attribute at once, the current time never moves
+            curves = {}
+            for plug, originalValue in originalAttributes.items():
+                curve = self.curveWriter.writeCurve(plug, times, soundValues * self.valueMultiplier + originalValue, tangents=tangents)
+                curves[plug] = (curve, originalValue)
+
+            # Remember what the curves were made from, the events of the Beats method do not change with the band
+            self.bakedCurves = curves if self.analyzerMethod != "Beats" else {}
+            self.bakedFeatures = self.soundFeatures
+            self.bakedMethod = self.analyzerMethod
+
+        self.MeasureRun("bake", bake)
+
+    def ConnectFeatureNodes(self, ObjScroll, AttrScroll, *args):
+        """
+        Drives the attributes with audioFeature nodes instead of keys, the value of every frame is looked up when Maya evaluates it
+        """
+        if not self.reader:
+            cmds.warning("Please apply an audio first")
+            return
+
+        if self.analyzerMethod not in MODES:
+            cmds.warning("Audio nodes only follow the WaveForm and Spectrum methods")
+            return
+
+        objList = cmds.textScrollList(ObjScroll, query=True, selectUniqueTagItem=True)
+        attrList = cmds.textScrollList(AttrScroll, query=True, selectUniqueTagItem=True)
+
+        if not objList:
+            cmds.warning("Please select at least one object in the Object scroll list")
+            return
+
+        if not attrList:
+            cmds.warning("Please select at least one attribute in the Attribute scroll list")
+            return
+
+        if not cmds.pluginInfo("audioFeatureNode", query=True, loaded=True):
+            try:
+                cmds.loadPlugin("audioFeatureNode")
+            except RuntimeError:
+                cmds.warning("The audioFeatureNode plug-in was not found, add the plug-ins folder to MAYA_PLUG_IN_PATH")
+                return
+
+        # Like a bake, the nodes start from the values the attributes had before any preview
+        self.previewDriver.stop()
+
+        # The nodes start the track where the audio node does
+        timing = self.GetTiming(mel.eval('currentTimeUnitToFPS()'))
+
+        for plug, originalValue in self.GetOriginalValues(objList, attrList).items():
+            node = cmds.createNode("audioFeature", name=self.curveWriter.nodeName(plug) + "_audio", skipSelect=True)
+
+            cmds.setAttr(node + ".filePath", self.reader.fileName, type="string")
+            cmds.setAttr(node + ".mode", MODES.index(self.analyzerMethod))
+            cmds.setAttr(node + ".measure", MEASURES.index(self.envelopeMode))
+            cmds.setAttr(node + ".scale", SCALES.index(self.bandScale))
+            cmds.setAttr(node + ".bands", self.bandAmount)
+            cmds.setAttr(node + ".band", self.selectedBand)
+            cmds.setAttr(node + ".attack", self.envelopeAttack)
+            cmds.setAttr(node + ".release", self.envelopeRelease)
+            cmds.setAttr(node + ".multiplier", self.valueMultiplier)
+            cmds.setAttr(node + ".base", originalValue)
+            cmds.setAttr(node + ".offset", timing.offset - timing.sourceStart)
+
+            # The node replaces the keys of the attribute
+            cmds.connectAttr("time1.outTime", node + ".time")
+            cmds.cutKey(plug, clear=True)
+            cmds.connectAttr(node + ".output", plug, force=True)
+
+    def UpdateBakedCurves(self):
+        """
+        Changes the keys of the last bake to the current multiplier and band, from the analysis it used.
+        The curves stay in the scene with their connections, only their keys change
+        """
+        if not (self.updateBakedCurves and self.bakedCurves):
+            return
+
+        frames, features = self.bakedFeatures
+        source = "band {}".format(self.selectedBand) if self.bakedMethod == "Spectrum" else "wave"
+
+        if source not in features:
+            return
+
+        def update():
+            times, soundValues, tangents = self.ReduceKeys(frames, features[source])
+
+            for plug, (curve, originalValue) in list(self.bakedCurves.items()):
+                # Curves deleted since the bake are forgotten
+                if not cmds.objExists(curve):
+                    del self.bakedCurves[plug]
+                    continue
+
+                self.curveWriter.updateCurve(curve, times, soundValues * self.valueMultiplier + originalValue, tangents)
+
+        self.MeasureRun("update", update)
+
+    def MeasureRun(self, name, function):
+        """
+        Runs a bake or a preview, measuring its stages and reporting them when the instrumentation is on
+        """
+        if not (profiler.enabled or self.profileNextRun):
+            return function()
+
+        try:
+            with profiler.stage(name):
+                if self.profileNextRun:
+                    # cProfile only captures a single run, it is too slow to leave on
+                    self.profileNextRun = False
+                    cmds.checkBox(self.profileCheckBox, edit=True, value=False)
+                    return profiler.capture(name, function)
+
+                return function()
+
+        finally:
+            # The report also has the analysis that ran in the background since the last one
+            if profiler.enabled:
+                profiler.report(name, self.saveTimingReports)
+
+    @measured("ui.soundValues")
+    def GetSoundKeys(self, frameRate, endFrame):
+        """
+        Returns the times, values and tangents of the keys until the end frame. Every frame gets a key,
+        except with the Beats method that only keys around the onsets or the beats
+        """
+        timing = self.GetTiming(frameRate)
+
+        if self.analyzerMethod != "Beats":
+            frames = timing.frames(1, endFrame, self.reader.nFrames)
+            return self.ReduceKeys(frames, self.GetSoundValues(timing, frames))
+
+        self.WaitForAnalysis()
+        detector = self.reader.onsetDetector()
+
+        if self.eventType == "beats":
+            seconds, strengths = detector.beats()
+        else:
+            seconds, strengths = detector.onsets(self.eventSensitivity)
+
+        times, values, tangents = eventKeys(timing.framesAt(seconds), strengths, self.eventAttack, self.eventDecay,
+                                            self.attackShape, self.decayShape)
+
+        # Stop when the timeline is finished
+        count = int(np.searchsorted(times, endFrame, side="right"))
+        return times[:count], values[:count], tangents[:count]
+
+    def ReduceKeys(self, times, soundValues, multiplier=None):
+        """
+        Removes the keys that are not needed to stay within the key tolerance, returns the times, values and tangents left.
+        By default the values are going to be multiplied by the value multiplier
+        """
+        if not self.keyTolerance:
+            return times, soundValues, None
+
+        # The tolerance is in the units of the attributes, the values are multiplied later
+        kept = reduceKeys(times, soundValues, self.keyTolerance / max(abs(multiplier or self.valueMultiplier), 1e-12))
+
+        sys.stdout.write("# Keys per attribute: {} before the reduction, {} after\n".format(len(times), len(kept)))
+        profiler.count("keysBeforeReduction", len(times))
+        profiler.count("keysAfterReduction", len(kept))
+
+        # Only straight lines between the keys are sure to stay within the tolerance
+        return times[kept], soundValues[kept], [("linear", "linear")] * len(kept)
+
+    def GetTiming(self, frameRate):
+        """
+        Returns where the frames of the scene play the selected track, following the offset of its audio node
+        """
+        offset, sourceStart = 1.0, 0.0
+
+        if self.audioNode and cmds.objExists(self.audioNode):
+            offset = cmds.getAttr(self.audioNode + ".offset")
+            sourceStart = cmds.getAttr(self.audioNode + ".sourceStart")
+
+        return FrameTiming(self.reader.frameRate, frameRate, offset, sourceStart, self.subFrames)
+
+    def GetSoundValues(self, timing, frames):
+        """
+        Returns the value of every frame, that can be fractional, using the selected analyzing method
+        """
+        # Use the background analysis once it is done
+        self.WaitForAnalysis()
+
+        if self.analyzerMethod == "Spectrum":
+            # Every band comes from the same spectrum, keep them all to change the band of a bake later
+            sources = ["band {}".format(band) for band in xrange(1, self.bandAmount + 1)]
+            source = "band {}".format(self.selectedBand)
+        else:
+            source = "wave"
+            sources = [source]
+
+        features = self.reader.timedValues(timing, frames, sources, self.envelopeMode, self.bandAmount, self.bandScale,
+                                           self.envelopeAttack, self.envelopeRelease)
+        self.soundFeatures = (frames, features)
+
+        return features[source]
+
+    def GetWaveValues(self, frameRate):
+        """
+        Returns the waveform value of every frame measured as the user selected
+        """
+        return self.reader.frameValues(frameRate, "WaveForm", self.envelopeMode,
+                                       attack=self.envelopeAttack, release=self.envelopeRelease)
+
+    def UpdateSourceMenu(self):
+        """
+        Fills the source menu of the mapping table with the channels of the track and the bands of the spectrum
+        """
+        selected = cmds.optionMenu(self.sourceMenu, query=True, value=True)
+
+        for item in cmds.optionMenu(self.sourceMenu, query=True, itemListLong=True) or []:
+            cmds.deleteUI(item)
+
+        channels = self.reader.channels if self.reader else 1
+        labels = ["Channel {}".format(channel) for channel in xrange(1, channels + 1)]
+        labels += ["Band {}".format(band) for band in xrange(1, self.bandAmount + 1)]
+
+        for label in labels:
+            cmds.menuItem(label=label, parent=self.sourceMenu)
+
+        # Keep the source that was selected if it still exists
+        if selected in labels:
+            cmds.optionMenu(self.sourceMenu, edit=True, value=selected)
+
+    def AddMappings(self, ObjScroll, AttrScroll, *args):
+        """
+        Maps the selected attributes of the selected objects to the source of the menu, with the current multiplier
+        """
+        objList = cmds.textScrollList(ObjScroll, query=True, selectUniqueTagItem=True) or []
+        attrList = cmds.textScrollList(AttrScroll, query=True, selectUniqueTagItem=True) or []
+        source = cmds.optionMenu(self.sourceMenu, query=True, value=True).lower()
+
+        self.SetMappings([(obj + "." + attr, source) for obj in objList for attr in attrList])
+
+    def SpreadBands(self, ObjScroll, AttrScroll, *args):
+        """
+        Maps the selected attributes of every selected object to the next band, starting again after the last one
+        """
+        objList = cmds.textScrollList(ObjScroll, query=True, selectUniqueTagItem=True) or []
+        attrList = cmds.textScrollList(AttrScroll, query=True, selectUniqueTagItem=True) or []
+
+        self.SetMappings([(obj + "." + attr, "band {}".format(index % self.bandAmount + 1))
+                          for index, obj in enumerate(objList) for attr in attrList])
+
+    def SetMappings(self, pairs):
+        """
+        Adds attributes with their sources to the mapping table, an attribute that was mapped already is replaced
+        """
+        if not pairs:
+            cmds.warning("Please select at least one object and one attribute")
+            return
+
+        plugs = set(plug for plug, source in pairs)
+        self.mappings = [mapping for mapping in self.mappings if mapping["plug"] not in plugs]
+        self.mappings += [{"plug": plug, "source": source, "multiplier": self.valueMultiplier} for plug, source in pairs]
+
+        self.UpdateMappingList()
+
+    def RemoveMappings(self, *args):
+        """
+        Removes the selected rows of the mapping table
+        """
+        selected = set(index - 1 for index in cmds.textScrollList(self.mappingList, query=True, selectIndexedItem=True) or [])
+        self.mappings = [mapping for index, mapping in enumerate(self.mappings) if index not in selected]
+
+        self.UpdateMappingList()
+
+    def ClearMappings(self, *args):
+        """
+        Empties the mapping table
+        """
+        self.mappings = []
+        self.UpdateMappingList()
+
+    def UpdateMappingList(self):
+        """
+        Shows every mapping of the table as a row
+        """
+        cmds.textScrollList(self.mappingList, edit=True, removeAll=True)
+
+        for mapping in self.mappings:
+            cmds.textScrollList(self.mappingList, edit=True, append="{plug}  <-  {source}  x{multiplier}".format(**mapping))
+
+    def SetMappedKeys(self, *args):
+        """
+        Animates every attribute of the mapping table, analyzing every source once and writing all the curves together
+        """
+        if not self.reader:
+            cmds.warning("Please apply an audio first")
+            return
+
+        if not self.mappings:
+            cmds.warning("Please add at least one attribute to the mapping table")
+            return
+
+        # The preview curves are not the values to animate from
+        self.previewDriver.stop()
+
+        endFrame = int(cmds.playbackOptions(query=True, maxTime=True))
+        frameRate = mel.eval('currentTimeUnitToFPS()')
+
+        def bake():
+            self.WaitForAnalysis()
+
+            timing = self.GetTiming(frameRate)
+            frames = timing.frames(1, endFrame, self.reader.nFrames)
+
+            try:
+                sources = self.reader.timedValues(timing, frames, [mapping["source"] for mapping in self.mappings], self.envelopeMode,
+                                                  self.bandAmount, self.bandScale, self.envelopeAttack, self.envelopeRelease)
+            except ValueError as error:
+                cmds.warning(str(error))
+                return
+
+            # Attributes that share a source and a multiplier share their keys
+            keys = {}
+            curves = []
+
+            for mapping in self.mappings:
+                key = (mapping["source"], mapping["multiplier"])
+
+                if key not in keys:
+                    keys[key] = self.ReduceKeys(frames, sources[mapping["source"]], mapping["multiplier"])
+
+                times, soundValues, tangents = keys[key]
+                curves.append((mapping["plug"], times, soundValues * mapping["multiplier"] + cmds.getAttr(mapping["plug"]), tangents))
+
+            # Write every curve once everything is analyzed
+            for plug, times, values, tangents in curves:
+                self.curveWriter.writeCurve(plug, times, values, tangents=tangents)
+
+        self.MeasureRun("bakeTable", bake)
+
+    @measured("ui.originalValues")
+    def GetOriginalValues(self, objList, attrList):
+        """
+        Returns a dictionary with the current value of every attribute of every object
+        """
+        plugs = [obj + "." + attr for obj in objList for attr in attrList]
+
+        return dict((plug, cmds.getAttr(plug)) for plug in plugs)
+
+    def SetParallelAnalysis(self, enabled, *args):
+        """
+        Chooses between analyzing on a pool of processes or on a single thread
+        """
+        self.parallelAnalysis = enabled
+
+    def SetInstrumentation(self, enabled, *args):
+        """
+        Starts or stops measuring every stage of the analysis and baking
+        """
+        profiler.enabled = enabled
+        profiler.reset()
+
+    def SetTimingReports(self, enabled, *args):
+        """
+        Chooses whether the timing reports are also saved as JSON files
+        """
+        self.saveTimingReports = enabled
+
+    def SetProfileNextRun(self, enabled, *args):
+        """
+        Chooses whether the next bake or preview is captured with cProfile
+        """
+        self.profileNextRun = enabled
+
+    def ClearCache(self, *args):
+        """
+        Deletes every analysis saved on disk
+        """
+        self.analysisCache.invalidate()
+
+    def setMultiplier(self, multiplier):
+        """
+        Sets the valueMultiplier
+        """
+        self.valueMultiplier = multiplier
+        self.UpdateBakedCurves()
+
+    def setKeyTolerance(self, tolerance):
+        """
+        Sets the keyTolerance
+        """
+        self.keyTolerance = max(0.0, tolerance)
+
+    def SetUpdateBakedCurves(self, enabled, *args):
+        """
+        Chooses whether changing the multiplier or the band changes the last animation
+        """
+        self.updateBakedCurves = enabled
+
+    def setSubFrames(self, subFrames):
+        """
+        Sets the subFrames
+        """
+        self.subFrames = max(1, int(subFrames))
+            
+    def drawSpectrum(self, *args):
+        """
+        This function draws the audio spectrum on the UI, it is drawn again every time the current frame changes
+        """
+        if not self.reader:
+            cmds.warning("Please apply an audio first")
+            return
+
+        cmds.setParent(self.mainLayout)
+        cmds.deleteUI(self.graph)
+        self.graph = cmds.frameLayout(height=200, width=500, labelVisible=False)
+        self.spectrumCurve = cmds.falloffCurve()
+        cmds.setParent("..")
+
+        # The job goes away with the layout, when the waveform or a new spectrum replaces it
+        cmds.scriptJob(event=["timeChanged", self.UpdateSpectrum], parent=self.graph)
+        self.UpdateSpectrum()
+
+    def UpdateSpectrum(self):
+        """
+        Shows the spectrum of the current frame, read from the spectrogram of the track so it keeps up with the playback
+        """
+        if not self.reader:
+            return
+
+        frameRate = mel.eval('currentTimeUnitToFPS()')
+        analysis = (self.reader, frameRate, self.bandAmount, self.bandScale)
+        worker = self.analysisWorkers.get(self.reader)
+
+        if self.spectrumFrames[0] != analysis and worker and worker.isRunning():
+            # The background analysis is computing this spectrum, computing it here too would freeze the playback
+            self.SetSpectrumCurve([0.0] * self.bandAmount)
+            return
+
+        if self.spectrumFrames[0] != analysis:
+            # The bands of every frame are normalized once, using the max value of the frame
+            bands = self.reader.spectrogram(frameRate, self.bandAmount, scale=self.bandScale)
+            peaks = bands.max(axis=1)[:, np.newaxis] if len(bands) else bands
+            self.spectrumFrames = (analysis, self.reader.analysisSizes(frameRate)[0], bands / np.maximum(peaks, 1e-12))
+
+        analysis, hop, frames = self.spectrumFrames
+        position = self.GetTiming(frameRate).samplePositions([cmds.currentTime(query=True)])[0]
+        frame = int(np.floor(position / hop + 1e-6))
+
+        # The frames before and after the track are silent
+        self.SetSpectrumCurve(frames[frame].tolist() if 0 <= frame < len(frames) else [0.0] * self.bandAmount)
+
+    def SetSpectrumCurve(self, norm):
+        """
+        Draws the normalized value of every band on the spectrum curve
+        """
+        curvePoints = ["{},{}".format(1.0*x/self.bandAmount, norm[x-1]) for x in xrange(self.bandAmount+1)]
+        cmds.falloffCurve(self.spectrumCurve, edit=True, asString=",".join(curvePoints))
+
+    def drawGraph(self, *args):
+        """
+        This function draws the soundWave on the UI
+        """
+        if not self.reader:
+            cmds.warning("Please apply an audio first")
+            return
+
+        frameRate = mel.eval('currentTimeUnitToFPS()')
+
+        self.WaitForAnalysis()
+        pyramid = self.reader.peakPyramid()
+        values = self.GetWaveValues(frameRate)
+
+        cmds.setParent(self.mainLayout)
+        cmds.deleteUI(self.graph)
+        self.graph = cmds.frameLayout(height=200, width=500, labelVisible=False)
+
+        # Qt is only loaded the first time a waveform is drawn
+        from .waveform import WaveformWidget, QtWidgets, wrapInstance
+
+        # Put the waveform widget inside the Maya layout, no scene nodes are needed
+        layoutWidget = wrapInstance(int(OpenMayaUI.MQtUtil.findLayout(self.graph)), QtWidgets.QWidget)
+        layoutWidget.layout().addWidget(WaveformWidget(pyramid, values, 1.0 * self.reader.frameRate / frameRate, layoutWidget))
+        cmds.setParent("..")
+
+# The window that is open, only one exists at a time
+theUI = None
+
+def show():
+    """
+    Builds the Music Animator window and returns it, this is the only place the UI is created
+    """
+    global theUI
+
+    # The tracks of the previous window are not used anymore
+    if theUI:
+        theUI.ReleaseReaders()
+
+    theUI = MainUI()
+    return theUI
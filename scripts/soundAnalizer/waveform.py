@@ -0,0 +1,85 @@
+"""
+The Qt widget that draws the waveform, it is only imported when the waveform is drawn
+"""
+try:
+    from PySide2 import QtCore, QtGui, QtWidgets
+    from shiboken2 import wrapInstance
+except ImportError:
+    from PySide6 import QtCore, QtGui, QtWidgets
+    from shiboken6 import wrapInstance
+
+from .compat import xrange
+from .lazy import LazyModule
+
+np = LazyModule("numpy")
+
+class WaveformWidget(QtWidgets.QWidget):
+    """
+    This widget draws the waveform from a peak pyramid, reading only the level that fits its width.
+    The mouse wheel zooms around the cursor and a double click shows the whole track again
+    """
+    def __init__(self, pyramid, frameValues=None, samplesPerFrame=1.0, parent=None):
+        super(WaveformWidget, self).__init__(parent)
+
+        self.pyramid = pyramid                      # The peaks of the track
+        self.frameValues = frameValues              # The value of every animation frame, drawn over the waveform
+        self.samplesPerFrame = samplesPerFrame      # The samples between animation frames
+        self.startSample = 0                        # The first sample shown
+        self.endSample = pyramid.nFrames            # The sample after the last one shown
+
+        self.setMinimumHeight(180)
+
+    def paintEvent(self, event):
+        """
+        Draws a vertical line from the minimum to the maximum of every column
+        """
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor(43, 43, 43))
+
+        width = self.width()
+        middle = self.height() / 2.0
+
+        minimums, maximums = self.pyramid.columns(width, self.startSample, self.endSample)
+
+        painter.setPen(QtGui.QColor(100, 170, 220))
+        painter.drawLines([QtCore.QLineF(x, middle - maximums[x] * middle, x, middle - minimums[x] * middle) for x in xrange(width)])
+
+        if self.frameValues is not None and len(self.frameValues):
+            # The frames in view, scaled to the loudest one
+            firstFrame = int(self.startSample // self.samplesPerFrame)
+            lastFrame = min(len(self.frameValues), int(self.endSample // self.samplesPerFrame) + 2)
+            values = self.frameValues[firstFrame:lastFrame]
+            highest = float(np.abs(self.frameValues).max()) or 1.0
+
+            xs = (np.arange(firstFrame, lastFrame) * self.samplesPerFrame - self.startSample) * width / (self.endSample - self.startSample)
+            ys = middle - values / highest * middle
+
+            painter.setPen(QtGui.QColor(240, 180, 60))
+            painter.drawPolyline(QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist())]))
+
+        painter.end()
+
+    def wheelEvent(self, event):
+        """
+        Zooms in or out around the cursor
+        """
+        delta = event.angleDelta().y()
+        position = event.position().x() if hasattr(event, "position") else event.pos().x()
+
+        span = self.endSample - self.startSample
+        newSpan = min(self.pyramid.nFrames, max(64, int(span * (0.8 if delta > 0 else 1.25))))
+
+        # Keep the sample under the cursor in the same place
+        anchor = self.startSample + span * position / max(1, self.width())
+        self.startSample = int(max(0, min(self.pyramid.nFrames - newSpan, anchor - newSpan * position / max(1, self.width()))))
+        self.endSample = self.startSample + newSpan
+
+        self.update()
+
+    def mouseDoubleClickEvent(self, event):
+        """
+        Shows the whole track
+        """
+        self.startSample = 0
+        self.endSample = self.pyramid.nFrames
+        self.update()
@@ -0,0 +1,154 @@
+"""
+Reads the samples of wav files straight from the disk
+"""
+import mmap, struct
+
+from .lazy import LazyModule
+
+np = LazyModule("numpy")
+
+class WavMap:
+    """
+    This class parses the header of a wav file once and maps its data chunk in memory,
+    so any range of samples can be viewed without reading or copying the file
+    """
+    def __init__(self, filePath):
+
+        self.fileName = filePath
+
+        # Wave format tags that can be mapped
+        self.PCM = 1
+        self.FLOAT = 3
+        self.EXTENSIBLE = 0xFFFE
+
+        # Map the whole file, the OS only loads the pages that are actually touched
+        with open(filePath, "rb") as fileObject:
+            self.map = mmap.mmap(fileObject.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.parseHeader()
+
+        # The typed view over every sample of the file, one row per frame
+        if self.sampleWidth == 3:
+            # There is no 24 bit type, keep the three bytes of every sample on the last axis
+            self.samples = np.frombuffer(self.map, dtype=np.uint8, count=self.nFrames * self.channels * 3,
+                                         offset=self.dataOffset).reshape(self.nFrames, self.channels, 3)
+        else:
+            self.samples = np.frombuffer(self.map, dtype=self.dtype, count=self.nFrames * self.channels,
+                                         offset=self.dataOffset).reshape(self.nFrames, self.channels)
+
+    def parseHeader(self):
+        """
+        Walks the RIFF chunks to find the format information and the position of the data
+        """
+        riff, riffSize, wave = struct.unpack_from("<4sI4s", self.map, 0)
+
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError('"{}" is not a RIFF wave file.'.format(self.fileName))
+
+        formatTag = None
+        self.dataOffset = None
+        position = 12
+
+        # Every chunk is an id, a size and its content padded to an even size
+        while position + 8 <= len(self.map):
+            chunkId, chunkSize = struct.unpack_from("<4sI", self.map, position)
+            position += 8
+
+            if chunkId == b"fmt ":
+                formatTag, self.channels, self.frameRate, byteRate, self.blockAlign, bits = struct.unpack_from("<HHIIHH", self.map, position)
+
+                # Extensible files keep the real format on the first two bytes of the sub format
+                if formatTag == self.EXTENSIBLE and chunkSize >= 26:
+                    formatTag = struct.unpack_from("<H", self.map, position + 24)[0]
+
+                self.sampleWidth = (bits + 7) // 8
+
+            elif chunkId == b"data":
+                self.dataOffset = position
+
+                # Streamed files may leave the size unset, use what is left of the file
+                dataSize = min(chunkSize, len(self.map) - position)
+                break
+
+            position += chunkSize + (chunkSize & 1)
+
+        if formatTag is None or self.dataOffset is None:
+            raise ValueError('"{}" has no format or data chunk.'.format(self.fileName))
+
+        if formatTag == self.FLOAT and self.sampleWidth == 4:
+            self.dtype = "<f4"
+        elif formatTag == self.PCM and self.sampleWidth in (1, 2, 3, 4):
+            self.dtype = {1: "u1", 2: "<i2", 3: None, 4: "<i4"}[self.sampleWidth]
+        else:
+            raise ValueError('Unsupported wave format {} with {} bits.'.format(formatTag, bits))
+
+        self.isFloat = formatTag == self.FLOAT
+        self.nFrames = dataSize // self.blockAlign
+
+    def frames(self, startFrame=0, endFrame=None, channel=None):
+        """
+        Returns a view of the raw samples between two frames, optionally of a single channel
+        """
+        view = self.samples[startFrame:endFrame]
+
+        if channel is not None:
+            # Keep the channel axis so the view still has one column
+            view = view[:, channel:channel + 1]
+
+        return view
+
+    def close(self):
+        """
+        Releases the mapping of the file
+        """
+        self.samples = None
+
+        try:
+            self.map.close()
+        except BufferError:
+            # Some view is still alive, the mapping is released when it goes away
+            pass
+
+class RingBuffer:
+    """
+    This class keeps the last samples decoded from a file in a buffer of fixed size
+    """
+    def __init__(self, capacity):
+
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.start = 0                          # The position in the file of the oldest sample kept
+        self.end = 0                            # The position in the file after the newest sample
+
+    def extend(self, values):
+        """
+        Adds samples after the newest ones, overwriting the oldest ones
+        """
+        capacity = len(self.data)
+
+        # Only the last samples fit
+        skipped = max(0, len(values) - capacity)
+        values = values[skipped:]
+        self.end += skipped
+
+        # Write up to the end of the buffer and wrap the rest to its beginning
+        position = self.end % capacity
+        firstPart = min(len(values), capacity - position)
+        self.data[position:position + firstPart] = values[:firstPart]
+        self.data[:len(values) - firstPart] = values[firstPart:]
+
+        self.end += len(values)
+        self.start = max(self.start, self.end - capacity)
+
+    def window(self, start, size):
+        """
+        Returns the samples from a position in the file, a view unless the window wraps around the buffer
+        """
+        if start < self.start or start + size > self.end:
+            raise IndexError("Samples {} to {} are not in the buffer.".format(start, start + size))
+
+        position = start % len(self.data)
+
+        if position + size <= len(self.data):
+            return self.data[position:position + size]
+
+        return np.concatenate((self.data[position:], self.data[:position + size - len(self.data)]))
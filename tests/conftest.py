@@ -0,0 +1,10 @@
+"""
+Puts the soundAnalizer package, the recording stand-ins of maya and the wav synthesizer of the benchmarks
+on the path, so the tests run in plain Python
+"""
+import os.path, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+sys.path[:0] = [os.path.join(ROOT, "benchmarks", "standins"), os.path.join(ROOT, "scripts"), os.path.join(ROOT, "benchmarks")]
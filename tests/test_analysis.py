@@ -0,0 +1,41 @@
+"""
+Checks the analysis of the wav files
+"""
+import numpy as np
+import pytest
+
+import synthwav
+from soundAnalizer.analysis import Envelope, WavReader
+
+@pytest.fixture(scope="module")
+def reader(tmp_path_factory):
+    """
+    Returns a reader of a short synthetic stereo track
+    """
+    path = str(tmp_path_factory.mktemp("tracks") / "track.wav")
+    synthwav.writeWav(path, 3, 2, 2)
+    return WavReader(path)
+
+@pytest.mark.parametrize("mode", ["rms", "mean", "peak"])
+def testBlockEnvelope(reader, mode):
+    samples = reader.decodeFrames(reader.wavMap.frames(0, reader.nFrames, 1))[:, 0].astype(np.float64)
+    envelope = Envelope(reader, 1, blockSize=1024)
+
+    # Windows inside a block, across many blocks and inside the last partial block
+    starts = np.array([0, 100, 1000, 5000, 20000, reader.nFrames - 10])
+    ends = np.minimum(starts + np.array([10, 500, 2000, 40000, 1600, 100]), reader.nFrames)
+
+    expected = {"rms": lambda window: np.sqrt(np.mean(window ** 2)), "mean": lambda window: np.mean(np.abs(window)),
+                "peak": lambda window: np.max(np.abs(window))}[mode]
+
+    values = envelope.windowValues(starts, ends, mode)
+    assert values == pytest.approx([expected(samples[start:end]) for start, end in zip(starts, ends)], rel=1e-5)
+
+def testEnvelopeBudget(reader):
+    longTrack = WavReader(reader.fileName)
+    longTrack.maxEnvelopeBytes = 1024
+
+    # The track does not fit in the budget, its sums have a value every block and give the same envelope
+    assert longTrack.envelope(30, "rms", channel=1) == pytest.approx(reader.envelope(30, "rms", channel=1), rel=1e-5)
+    assert longTrack.getEnvelope(1).blockSize == longTrack.envelopeBlockSize
+    assert reader.getEnvelope(1).blockSize == 1
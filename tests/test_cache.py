@@ -0,0 +1,45 @@
+"""
+Checks the disk cache of the analysis
+"""
+import threading
+
+import numpy as np
+
+from soundAnalizer.cache import AnalysisCache
+
+def testConcurrentSaves(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    track = tmp_path / "track.wav"
+    track.write_bytes(b"RIFF")
+
+    errors = []
+    values = np.arange(100000, dtype=np.float32)
+
+    def save():
+        try:
+            cache.save(str(track), "spectrogram", {"fps": 24}, values=values)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=save) for thread in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert np.array_equal(cache.load(str(track), "spectrogram", {"fps": 24})["values"], values)
+
+    # Only the entry is left, no temporary files
+    assert [path.suffix for path in (tmp_path / "cache").iterdir()] == [".npz"]
+
+def testFailedSaveIsIgnored(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    track = tmp_path / "track.wav"
+    track.write_bytes(b"RIFF")
+
+    # The cache folder is gone, the analysis goes on without it
+    (tmp_path / "cache").rmdir()
+    cache.save(str(track), "spectrogram", {"fps": 24}, values=np.zeros(4))
+
+    assert cache.load(str(track), "spectrogram", {"fps": 24}) is None
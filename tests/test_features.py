@@ -0,0 +1,74 @@
+"""
+Checks the lookup of the audioFeature nodes, which does not need Maya
+"""
+import threading
+
+import pytest
+
+import synthwav
+from soundAnalizer.analysis import WavReader
+from soundAnalizer.features import FeatureLookup
+from soundAnalizer.registry import ReaderRegistry
+
+@pytest.fixture
+def track(tmp_path):
+    """
+    Returns the path of a short synthetic track
+    """
+    path = str(tmp_path / "track.wav")
+    synthwav.writeWav(path, 2, 2, 1)
+    return path
+
+def testInterpolation(track):
+    lookup = FeatureLookup(ReaderRegistry())
+    values = lookup.values(track, 24, "wave", "rms")
+
+    # Frame offset + n is value n, the frames between two values are interpolated
+    assert lookup.lookup(track, 11.0, 24, "wave", "rms", offset=1.0) == pytest.approx(values[10])
+    assert lookup.lookup(track, 11.25, 24, "wave", "rms", offset=1.0) == pytest.approx(0.75 * values[10] + 0.25 * values[11])
+
+def testSilenceOutsideTheTrack(track):
+    lookup = FeatureLookup(ReaderRegistry())
+    values = lookup.values(track, 24, "wave", "peak")
+
+    assert lookup.lookup(track, 0.0, 24, "wave", "peak", offset=10.0) == 0.0
+    assert lookup.lookup(track, 10.0 + len(values), 24, "wave", "peak", offset=10.0) == 0.0
+    assert lookup.lookup(track, 10.0, 24, "wave", "peak", offset=10.0) == pytest.approx(values[0])
+
+def testSingleAnalysisForManyThreads(track, monkeypatch):
+    spectrogram = WavReader.spectrogram
+    calls = []
+
+    def countedSpectrogram(self, *args, **kwargs):
+        calls.append(args)
+        return spectrogram(self, *args, **kwargs)
+
+    monkeypatch.setattr(WavReader, "spectrogram", countedSpectrogram)
+
+    lookup = FeatureLookup(ReaderRegistry())
+    results = {}
+
+    def lookUp(band):
+        results[band] = lookup.lookup(track, 12.0, 24, "band {}".format(band), bands=8)
+
+    # Eight nodes reading the bands of the same track
+    threads = [threading.Thread(target=lookUp, args=(band,)) for band in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == list(range(1, 9))
+
+def testLeastRecentlyUsedEviction(track):
+    lookup = FeatureLookup(ReaderRegistry(), maxFeatures=2)
+
+    lookup.values(track, 24, "wave", "rms")
+    lookup.values(track, 24, "wave", "peak")
+
+    # Using the rms values again keeps them, the peak values are the least recently used
+    lookup.values(track, 24, "wave", "rms")
+    lookup.values(track, 24, "wave", "mean")
+
+    assert [key[3] for key in lookup.features] == ["rms", "mean"]
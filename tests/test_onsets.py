@@ -0,0 +1,50 @@
+"""
+Checks the tempo and the beats found on a synthetic kick track
+"""
+import wave
+
+import numpy as np
+import pytest
+
+import synthwav
+from soundAnalizer.analysis import WavReader
+
+BPM = 128.0
+
+@pytest.fixture(scope="module")
+def detector(tmp_path_factory):
+    """
+    Returns the onset detector of 30 seconds of kicks at BPM over a chord and some noise
+    """
+    sampleRate = 48000
+    seconds = np.arange(30 * sampleRate) / float(sampleRate)
+
+    # A kick is a short decaying low tone, the period is not a whole amount of analysis frames
+    beat = np.mod(seconds, 60.0 / BPM)
+    kick = np.sin(2 * np.pi * 55 * beat) * np.exp(-beat * 30)
+    chord = sum(np.sin(2 * np.pi * frequency * seconds) for frequency in (220.0, 277.2, 329.6))
+    noise = np.random.RandomState(0).uniform(-1, 1, len(seconds))
+
+    path = str(tmp_path_factory.mktemp("tracks") / "kicks.wav")
+    waveFile = wave.open(path, "wb")
+    waveFile.setnchannels(1)
+    waveFile.setsampwidth(2)
+    waveFile.setframerate(sampleRate)
+    waveFile.writeframes(synthwav.encode(np.clip(0.15 * chord + 0.3 * kick + 0.05 * noise, -1, 1), 2))
+    waveFile.close()
+
+    return WavReader(path).onsetDetector()
+
+def testTempo(detector):
+    assert detector.tempo() == pytest.approx(BPM, abs=0.5)
+
+def testBeatsFollowTheKicks(detector):
+    seconds, strengths = detector.beats()
+    kicks = np.arange(0, 30, 60.0 / BPM)
+
+    # Every beat is on a kick up to the end of the track, the last one may be the kick right after it.
+    # No kick after the first one is missed
+    distances = np.abs(seconds[:, None] - np.append(kicks, kicks[-1] + 60.0 / BPM)[None, :]).min(axis=1)
+    assert distances.max() < 0.03
+    assert len(seconds) >= len(kicks) - 1
+    assert strengths.max() == pytest.approx(1.0)
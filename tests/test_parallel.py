@@ -0,0 +1,36 @@
+"""
+Checks that the pool of processes gives the same analysis as a single process
+"""
+import numpy as np
+import pytest
+
+import synthwav
+from soundAnalizer.analysis import WavReader
+from soundAnalizer.parallel import ParallelAnalyzer
+
+@pytest.fixture(scope="module")
+def paths(tmp_path_factory):
+    """
+    Returns the paths of two synthetic tracks with different formats, both longer than a chunk
+    """
+    directory = tmp_path_factory.mktemp("tracks")
+    paths = [str(directory / "stereo.wav"), str(directory / "mono.wav")]
+
+    synthwav.writeWav(paths[0], 20, 3, 2)
+    synthwav.writeWav(paths[1], 40, 2, 1)
+
+    return paths
+
+@pytest.mark.parametrize("bands", [None, 4])
+def testParallelEqualsSerial(paths, bands):
+    # The smallest chunks, so the frames of every track are split between the processes
+    analyzer = ParallelAnalyzer(workers=2, chunkFrames=1)
+    assert analyzer.context is not None
+    results = analyzer.spectrograms([WavReader(path) for path in paths], 29.97, bands=bands)
+
+    for path, result in zip(paths, results):
+        reader = WavReader(path)
+        expected = reader.spectrogram(29.97, bands) if bands else reader.magnitudeSpectrogram(29.97)
+
+        assert result.shape == expected.shape
+        assert np.array_equal(result, expected)
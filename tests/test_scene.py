@@ -0,0 +1,161 @@
+"""
+Checks the curves written in the scene against the recording stand-in of maya.cmds
+"""
+import numpy as np
+import pytest
+
+from maya import cmds
+from soundAnalizer.scene import CurveWriter, PreviewDriver
+
+@pytest.fixture(autouse=True)
+def recording():
+    """
+    Starts every test without recorded calls or curves
+    """
+    cmds.reset()
+    cmds.curveKeys.clear()
+    yield
+    cmds.reset()
+
+class LockedCommands:
+    """
+    The stand-in of maya.cmds where some attributes are locked and every attribute is driven through a unitConversion node
+    """
+    def __init__(self, lockedPlugs):
+        self.lockedPlugs = lockedPlugs
+
+    def __getattr__(self, name):
+        command = getattr(cmds, name)
+
+        def lockedCommand(*args, **kwargs):
+            if name == "cutKey" and args[0] in self.lockedPlugs:
+                raise RuntimeError("The attribute '{}' is locked".format(args[0]))
+
+            if name == "listConnections":
+                cmds.calls.append((name, args, kwargs))
+                return ["unitConversion1.output"] if not kwargs.get("skipConversionNodes") else ["animCurve1.output"]
+
+            return command(*args, **kwargs)
+
+        return lockedCommand
+
+def recorded(name):
+    """
+    Returns the arguments of every recorded call of a command
+    """
+    return [args for call, args, kwargs in cmds.calls if call == name]
+
+def testFailedPreviewIsUndone():
+    commands = LockedCommands(["pCube2.translateX"])
+    stopped = []
+    driver = PreviewDriver(CurveWriter(commands), commands)
+
+    with pytest.raises(RuntimeError):
+        driver.start({"pCube1.translateX": 0.0, "pCube2.translateX": 1.0}, np.arange(3.0), np.ones(3), 1.0,
+                     stopCommand=lambda: stopped.append(True))
+
+    # The connections are put back as they were, the preview curve of the first attribute is deleted
+    assert not driver.isActive()
+    assert stopped == [True]
+    assert sorted(recorded("disconnectAttr")) == sorted(recorded("connectAttr")[1:])
+    assert ("unitConversion1.output", "pCube2.translateX") in recorded("connectAttr")
+    assert recorded("delete") == [(["MusicAnimatorPreview1"],)]
+
+    # The driver works again after the failure
+    driver.stop()
+    driver.start({"pCube1.translateX": 0.0}, np.arange(3.0), np.ones(3), 1.0)
+    assert driver.isActive()
+
+    driver.stop()
+    assert not driver.isActive()
+
+class KeyedCommands:
+    """
+    The stand-in of maya.cmds where the attributes already have keys, given as (time, value, in tangent, out tangent)
+    """
+    def __init__(self, keys):
+        self.keys = keys
+
+    def __getattr__(self, name):
+        command = getattr(cmds, name)
+
+        def keyedCommand(*args, **kwargs):
+            query = kwargs.get("query")
+            keys = self.keys.get(args[0], []) if args else []
+
+            if query and name in ("keyframe", "keyTangent") and not kwargs.get("g"):
+                cmds.calls.append((name, args, kwargs))
+
+                if kwargs.get("keyframeCount"):
+                    start, end = kwargs.get("time", (float("-inf"), float("inf")))
+                    return sum(1 for key in keys if start <= key[0] <= end)
+
+                column = [kwargs.get(flag) for flag in ("timeChange", "valueChange", "inTangentType", "outTangentType")].index(True)
+                return [key[column] for key in keys]
+
+            return command(*args, **kwargs)
+
+        return keyedCommand
+
+def keyTimeValues(curve):
+    """
+    Returns the (time, value) of every key written on a curve with keyTimeValue
+    """
+    values = [args[1:] for args in recorded("setAttr") if args[0].startswith(curve + ".keyTimeValue")]
+    assert len(values) == 1
+    return list(zip(values[0][0::2], values[0][1::2]))
+
+def testOneSetAttrPerAttribute():
+    writer = CurveWriter(cmds)
+    curves = writer.writeCurves(dict(("pCube1.{}".format(attribute), (np.arange(1.0, 101.0), np.linspace(0, 1, 100)))
+                                     for attribute in ("translateX", "translateY", "rotateZ")))
+
+    # One node, one setAttr with every key and one connection per attribute
+    assert len(recorded("createNode")) == 3
+    assert len(recorded("setAttr")) == 3
+    assert sorted(recorded("connectAttr")) == sorted((curve + ".output", plug) for plug, curve in curves.items())
+    assert keyTimeValues(curves["pCube1.translateX"]) == list(zip(np.arange(1.0, 101.0), np.linspace(0, 1, 100)))
+
+def testKeysOutsideTheBakeAreKept():
+    commands = KeyedCommands({"|group1|ns:pCube1.translateX": [(-10.0, 5.0, "flat", "flat"), (3.0, 7.0, "auto", "auto"),
+                                                    (200.0, 9.0, "linear", "step")]})
+    writer = CurveWriter(commands)
+    curve = writer.writeCurve("|group1|ns:pCube1.translateX", np.array([1.0, 2.0, 3.0, 4.0]), np.zeros(4))
+
+    # The name has no path or namespace separators. The key on frame 3 is replaced, the ones before and after
+    # the bake are written with the new keys
+    assert curve == "ns_pCube1_translateX"
+    assert keyTimeValues(curve) == [(-10.0, 5.0), (1.0, 0.0), (2.0, 0.0), (3.0, 0.0), (4.0, 0.0), (200.0, 9.0)]
+
+    # They keep their tangents, the new keys get the default ones
+    edits = sorted((kwargs["index"], kwargs["inTangentType"], kwargs["outTangentType"])
+                   for call, args, kwargs in cmds.calls if call == "keyTangent" and kwargs.get("edit"))
+    assert edits == [([(0, 0)], "flat", "flat"), ([(1, 4)], "auto", "auto"), ([(5, 5)], "linear", "step")]
+
+def testTangents():
+    writer = CurveWriter(cmds)
+    tangents = [("linear", "linear"), ("linear", "linear"), ("flat", "flat"), ("linear", "step"), ("linear", "step")]
+    curve = writer.writeCurve("pCube1.translateX", np.arange(5.0), np.ones(5), tangents=tangents)
+
+    # Consecutive keys with the same tangents are set together
+    edits = sorted((kwargs["inTangentType"], kwargs["outTangentType"], kwargs["index"])
+                   for call, args, kwargs in cmds.calls if call == "keyTangent" and kwargs.get("edit"))
+    assert edits == [("flat", "flat", [(2, 2)]), ("linear", "linear", [(0, 1)]), ("linear", "step", [(3, 4)])]
+
+    # Without tangents every key gets the default ones of setKeyframe, with a single command
+    cmds.reset()
+    writer.writeCurve("pCube1.translateY", np.arange(5.0), np.ones(5))
+    edits = [kwargs for call, args, kwargs in cmds.calls if call == "keyTangent" and kwargs.get("edit")]
+    assert edits == [{"edit": True, "inTangentType": "auto", "outTangentType": "auto"}]
+    assert curve == "pCube1_translateX"
+
+def testUpdateKeepsTheCurve():
+    writer = CurveWriter(cmds)
+    curve = writer.writeCurve("pCube1.translateX", np.arange(10.0), np.ones(10))
+    cmds.reset()
+
+    # Fewer keys cut the ones left over, the curve and its connection stay
+    writer.updateCurve(curve, np.arange(6.0), np.zeros(6))
+    assert recorded("cutKey") == [(curve,)]
+    assert recorded("createNode") == [] and recorded("connectAttr") == []
+    assert keyTimeValues(curve) == list(zip(np.arange(6.0), np.zeros(6)))
@@ -0,0 +1,56 @@
+"""
+Checks that the frames of the scene land on the same samples however they are analyzed
+"""
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import synthwav
+from soundAnalizer.analysis import WavReader
+from soundAnalizer.timing import FrameTiming, exactRate, nearestSamples
+
+@pytest.fixture(scope="module")
+def reader(tmp_path_factory):
+    """
+    Returns a reader of a short synthetic track, its length is not a whole amount of 29.97 fps frames
+    """
+    path = str(tmp_path_factory.mktemp("tracks") / "track.wav")
+    synthwav.writeWav(path, 3, 2, 1)
+    return WavReader(path)
+
+def testNoDriftOverNinetyMinutes(reader):
+    timing = FrameTiming(48000, 29.97)
+    frames = timing.frames(1, 1 + 90 * 60 * 29.97)
+
+    # Every start is the exact position of the frame rounded to the nearest sample, the last one too
+    samplesPerFrame = Fraction(48000) / exactRate(29.97)
+    exact = [int((index * samplesPerFrame + Fraction(1, 2)) // 1) for index in range(len(frames))]
+    assert timing.sampleStarts(frames).tolist() == exact
+
+    # Every 30000 frames are exactly 1001 minutes of samples
+    assert timing.sampleStarts([1, 30001, 90001, 150001]).tolist() == [0, 48048000, 144144000, 240240000]
+
+    # The analysis of the whole track starts frame n on the same sample as the frame on its own
+    hop = reader.analysisSizes(29.97)[0]
+    assert nearestSamples(timing.wholeFrames(frames) * hop).tolist() == exact
+
+def testSameStartOnBothPaths(reader):
+    timing = FrameTiming(reader.frameRate, 29.97)
+    frames = timing.frames(1, 100, reader.nFrames)
+
+    # Whole frames use the spectrogram of the track, fractions of a frame the windows of every position
+    whole = reader.timedValues(timing, frames, ["band 3", "channel 1"], "rms")
+    positions = reader.timedValues(timing, frames + 1e-9, ["band 3", "channel 1"], "rms")
+
+    for source in whole:
+        assert whole[source] == pytest.approx(positions[source], rel=1e-4, abs=1e-6)
+
+def testLastFrameIsPadded(reader):
+    hop, windowSize = reader.analysisSizes(29.97)
+    bands = reader.spectrogram(29.97, 4)
+
+    # The last frame starts inside the track but its window goes past the end
+    assert nearestSamples((len(bands) - 1) * hop) + windowSize > reader.nFrames
+    assert nearestSamples(len(bands) * hop) >= reader.nFrames
+    assert bands[-1].max() > 0